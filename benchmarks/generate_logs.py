@@ -0,0 +1,144 @@
+"""
+Генератор синтетических log-файлов VimeWorld для бенчмарков:
+    - latest.log с первой строкой "Setting user: <ник>"
+    - Архивы YYYY-MM-DD-N.log.gz за сегодняшний день
+    - Убийства боссов из settings.yaml и команды пользователя с заданной частотой
+"""
+from datetime import datetime
+from os import path, makedirs
+import argparse
+import gzip
+import random
+import yaml
+
+SETTINGS_PATH = path.join(path.dirname(path.abspath(__file__)), "..", "src", "settings.yaml")
+CHAT_PREFIX = "[Client thread/INFO]: [CHAT]"
+FEMININE_BOSSES = {"Матка", "Коровка из Коровёнки"}
+PLURAL_BOSSES = {"Всадники апокалипсиса"}
+PLAYERS = ("Steve", "Alex", "Herobrine", "Notch", "Dinnerbone", "Jeb_", "Grumm", "Ксюша_2008")
+CHAT_MESSAGES = ("привет всем", "кто в шахту?", "продам алмазы дёшево", "го на босса",
+                 "где купить кирку?", "спасибо за помощь", "лагает сервер", "кто был на службе?")
+COMMANDS = ("~d 5", "~bl add Холуй", "~bl remove Холуй", "~m Карьер", "~b skip Йети")
+OTHER_LINES = ("[Render thread/INFO]: Reloading ResourceManager: Default",
+               "[Client thread/WARN]: Received passengers for unknown entity",
+               "[Client thread/INFO]: Connecting to mc.vimeworld.ru, 25565",
+               "[Netty Client IO #3/INFO]: Loaded 512 advancements",
+               "[Client thread/INFO]: [CHAT] [Prison] Добро пожаловать на сервер!")
+
+
+def load_boss_names(settings_path=SETTINGS_PATH):
+    """
+    Функция, загружающая имена боссов из файла с настройками
+    :param settings_path: Путь к settings.yaml
+    :return: Список имён боссов
+    """
+    with open(settings_path, encoding="windows-1251") as file:
+        return list(yaml.safe_load(file)["bosses_cooldown"])
+
+
+def kill_message(boss, rng):
+    """
+    Функция, формирующая сообщение чата об убийстве босса
+    :param boss: Имя босса
+    :param rng: Генератор случайных чисел
+    :return: Текст сообщения
+    """
+    if boss in PLURAL_BOSSES:
+        verb = "Все " + boss + " были повержены"
+    elif boss in FEMININE_BOSSES:
+        verb = boss + " была повержена"
+    else:
+        verb = boss + " был повержен"
+    return f"{verb} за {rng.randint(0, 9)} мин. {rng.randint(0, 59)} сек."
+
+
+def generate_lines(count, bosses, kill_rate=0.002, command_rate=0.0005, chat_rate=0.5,
+                   nickname="Steve", start=0, seed=0):
+    """
+    Функция, генерирующая строки log-файла
+    :param count: Количество строк
+    :param bosses: Список имён боссов
+    :param kill_rate: Доля строк с убийством босса
+    :param command_rate: Доля строк с командой пользователя
+    :param chat_rate: Доля остальных строк, являющихся сообщениями чата
+    :param nickname: Никнейм пользователя, отправляющего команды
+    :param start: Время первой строки в секундах от начала суток
+    :param seed: Зерно генератора случайных чисел
+    :return: Генератор строк без символа перевода строки
+    """
+    rng = random.Random(seed)
+    seconds = start
+    for _ in range(count):
+        seconds = (seconds + rng.choice((0, 0, 0, 1))) % 86400
+        timestamp = f"[{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}]"
+        roll = rng.random()
+        if roll < kill_rate:
+            yield f"{timestamp} {CHAT_PREFIX} {kill_message(rng.choice(bosses), rng)}"
+        elif roll < kill_rate + command_rate:
+            yield f"{timestamp} {CHAT_PREFIX} [Гильдия] {nickname}: {rng.choice(COMMANDS)}"
+        elif rng.random() < chat_rate:
+            yield f"{timestamp} {CHAT_PREFIX} [Prison] {rng.choice(PLAYERS)} > " \
+                  f"{rng.choice(CHAT_MESSAGES)}"
+        else:
+            yield f"{timestamp} {rng.choice(OTHER_LINES)}"
+
+
+def write_logs(directory, lines=100000, archives=0, archive_lines=100000, kill_rate=0.002,
+               command_rate=0.0005, nickname="Steve", seed=0, bosses=None):
+    """
+    Функция, записывающая latest.log и архивы в каталог логов
+    :param directory: Каталог, в который записываются файлы
+    :param lines: Количество строк в latest.log
+    :param archives: Количество архивов
+    :param archive_lines: Количество строк в каждом архиве
+    :param kill_rate: Доля строк с убийством босса
+    :param command_rate: Доля строк с командой пользователя
+    :param nickname: Никнейм пользователя
+    :param seed: Зерно генератора случайных чисел
+    :param bosses: Список имён боссов, по умолчанию - из settings.yaml
+    :return: Список путей к записанным файлам
+    """
+    makedirs(directory, exist_ok=True)
+    bosses = bosses or load_boss_names()
+    today = datetime.now().strftime("%Y-%m-%d")
+    written = []
+    for number in range(1, archives + 1):
+        file_path = path.join(directory, f"{today}-{number}.log.gz")
+        with gzip.open(file_path, "wt", encoding="utf-8", newline="\r\n") as file:
+            file.write(f"[00:00:00] [Client thread/INFO]: Setting user: {nickname}\n")
+            for line in generate_lines(archive_lines, bosses, kill_rate, 0, nickname=nickname,
+                                       seed=seed + number):
+                file.write(line + "\n")
+        written.append(file_path)
+    file_path = path.join(directory, "latest.log")
+    with open(file_path, "w", encoding="utf-8", newline="\r\n") as file:
+        file.write(f"[00:00:00] [Client thread/INFO]: Setting user: {nickname}\n")
+        for line in generate_lines(lines, bosses, kill_rate, command_rate, nickname=nickname,
+                                   seed=seed):
+            file.write(line + "\n")
+    written.append(file_path)
+    return written
+
+
+def main():
+    """
+    Функция, разбирающая аргументы командной строки и генерирующая log-файлы
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Генератор log-файлов VimeWorld")
+    parser.add_argument("directory", help="каталог для log-файлов")
+    parser.add_argument("--lines", type=int, default=100000, help="строк в latest.log")
+    parser.add_argument("--archives", type=int, default=0, help="количество архивов .gz")
+    parser.add_argument("--archive-lines", type=int, default=100000, help="строк в архиве")
+    parser.add_argument("--kill-rate", type=float, default=0.002, help="доля убийств боссов")
+    parser.add_argument("--command-rate", type=float, default=0.0005, help="доля команд")
+    parser.add_argument("--nickname", default="Steve", help="никнейм пользователя")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    args = parser.parse_args()
+    for file_path in write_logs(args.directory, args.lines, args.archives, args.archive_lines,
+                                args.kill_rate, args.command_rate, args.nickname, args.seed):
+        print(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Бенчмарки горячих участков VimeCheckify:
+    - processing_log с отключёнными и включёнными метриками (строк в секунду)
+    - Чтение latest.log с байтовым фильтром строк вместе с их обработкой (строк в секунду)
+    - processing_old_logs последовательно и параллельно (строк архивов в секунду)
+    - Просмотр latest.log с конца при запуске без контрольной точки (строк в секунду)
+    - load_settings_variables вместе с разбором settings.yaml (загрузок в секунду)
+    - Оповещения о боссах и вывод времени их респавна (операций в секунду)
+    - Обновление табло после убийства босса (убийств в секунду)
+    - Восстановление состояния боссов и оценка кулдаунов по индексу убийств (запросов в секунду)
+    - Холодный запуск до первой разобранной строки в отдельном процессе (запусков в секунду)
+    - Воспроизведение latest.log с виртуальными часами и оповещениями (строк в секунду)
+Для каждого бенчмарка измеряются пропускная способность и пиковое потребление памяти.
+Пропускная способность делится на результат эталонного бенчмарка reference (простая обработка
+строк на чистом Python), поэтому сохранённые в baselines.json отношения сравнимы на разных машинах.
+Результаты сравниваются с сохранёнными и с бюджетами MIN_THROUGHPUT, флаг --check завершает
+процесс с кодом 1 при регрессии. Бюджет холодного запуска проверяет и тест tests/test_startup.py.
+Все бенчмарки выполняются с виртуальными часами, остановленными в конце текущих суток, поэтому
+результат не зависит от времени запуска
+"""
+from datetime import datetime, time
+from os import path, devnull
+from types import SimpleNamespace
+from time import perf_counter
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = path.dirname(path.abspath(__file__))
+SRC_PATH = path.join(ROOT, "..", "src")
+SETTINGS_PATH = path.join(SRC_PATH, "settings.yaml")
+BASELINES_PATH = path.join(ROOT, "baselines.json")
+MEMORY_SLACK_KIB = 64
+MIN_THROUGHPUT = {"startup": 4}
+REFERENCE = "reference"
+STARTUP_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import vime_checkify
+settings = vime_checkify.SettingsStore.open(sys.argv[2])
+classifier = vime_checkify.LineClassifier("Steve")
+with open(sys.argv[3], encoding="utf-8") as file:
+    for line in file:
+        if classifier.classify(line) is not None:
+            break
+"""
+sys.path.insert(0, SRC_PATH)
+
+import vime_checkify
+from boss_board import BoardView, BossRespawn
+from backfill import scan_latest_reverse
+from checkpoint import CheckpointStore
+from clock import VirtualClock, set_clock
+from generate_logs import generate_lines, load_boss_names, write_logs
+from kill_index import KillIndex
+from line_classifier import LineClassifier, candidate_lines
+from log_tailer import LogTailer, PollingWatcher
+from metrics import METRICS
+from replay import replay
+from scheduler import Scheduler
+from settings_store import SettingsStore
+
+
+def bench_reference(workdir, lines):
+    """
+    Функция, подготавливающая эталонный бенчмарк: разбиение строк на чистом Python, не зависящее
+    от кода приложения. Относительно него сравниваются остальные бенчмарки
+    :param workdir: Временный каталог
+    :param lines: Количество строк
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    generated = list(generate_lines(lines, load_boss_names()))
+
+    def run():
+        for line in generated:
+            line.split(" ")
+
+    return run, lines, "lines/s"
+
+
+def bench_processing_log(workdir, lines, metrics=False):
+    """
+    Функция, подготавливающая бенчмарк processing_log на строках latest.log
+    :param workdir: Временный каталог
+    :param lines: Количество строк
+    :param metrics: Включить ли сбор метрик на время запуска
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    generated = list(generate_lines(lines, load_boss_names()))
+    settings = SettingsStore.open(SETTINGS_PATH)
+    bosses_cooldown = settings.bosses_cooldown
+    classifier = LineClassifier("Steve")
+
+    def run():
+        METRICS.enabled = metrics
+        try:
+            vime_checkify.processing_log(generated, {}, bosses_cooldown, 3, classifier, settings)
+        finally:
+            METRICS.enabled = False
+
+    return run, lines, "lines/s"
+
+
+def bench_tail_latest(workdir, lines):
+    """
+    Функция, подготавливающая бенчмарк чтения latest.log: выбор строк-кандидатов из байтов
+    и обработка только их
+    :param workdir: Временный каталог
+    :param lines: Количество строк в latest.log
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    log_path = path.join(workdir, "latest")
+    if not path.exists(log_path):
+        write_logs(log_path, lines=lines)
+    latest_log_path = path.join(log_path, "latest.log")
+    tailer = LogTailer(latest_log_path, PollingWatcher(latest_log_path), candidate_lines)
+    settings = SettingsStore.open(SETTINGS_PATH)
+    bosses_cooldown = settings.bosses_cooldown
+    classifier = LineClassifier("Steve")
+
+    def run():
+        tailer.seek(0)
+        vime_checkify.processing_log(tailer, {}, bosses_cooldown, 3, classifier, settings)
+
+    return run, lines, "lines/s"
+
+
+def bench_processing_old_logs(workdir, lines, archives, parallel):
+    """
+    Функция, подготавливающая бенчмарк processing_old_logs на архивах .gz
+    :param workdir: Временный каталог
+    :param lines: Количество строк в каждом архиве
+    :param archives: Количество архивов
+    :param parallel: Обрабатывать ли архивы в пуле процессов. Порог размера архивов
+    не применяется, иначе небольшие синтетические архивы просматривались бы в текущем процессе
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    log_path = path.join(workdir, "logs")
+    if not path.exists(log_path):
+        write_logs(log_path, lines=0, archives=archives, archive_lines=lines)
+    bosses_cooldown = SettingsStore.open(SETTINGS_PATH).bosses_cooldown
+
+    def run():
+        checkpoint = CheckpointStore(path.join(workdir, "checkpoint.json"))
+        vime_checkify.processing_old_logs({}, bosses_cooldown, 3, checkpoint, parallel, log_path,
+                                          min_bytes=0)
+
+    return run, lines * archives, "lines/s"
+
+
+def bench_latest_reverse_scan(workdir, lines):
+    """
+    Функция, подготавливающая бенчмарк просмотра latest.log с конца до последних убийств боссов
+    :param workdir: Временный каталог
+    :param lines: Количество строк в latest.log
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    log_path = path.join(workdir, "latest")
+    if not path.exists(log_path):
+        write_logs(log_path, lines=lines)
+    bosses = load_boss_names()
+
+    def run():
+        scan_latest_reverse(path.join(log_path, "latest.log"), bosses, 0)
+
+    return run, lines, "lines/s"
+
+
+def bench_startup(workdir):
+    """
+    Функция, подготавливающая бенчмарк холодного запуска: запуск интерпретатора, импорт
+    приложения, загрузка настроек и разбор latest.log до первого события
+    :param workdir: Временный каталог
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    log_path = path.join(workdir, "startup")
+    if not path.exists(log_path):
+        write_logs(log_path, lines=1000)
+    settings_path = shutil.copy(SETTINGS_PATH, path.join(workdir, "settings.yaml"))
+    command = [sys.executable, "-c", STARTUP_SCRIPT, SRC_PATH, settings_path,
+               path.join(log_path, "latest.log")]
+
+    def run():
+        subprocess.run(command, check=True)
+
+    return run, 1, "starts/s"
+
+
+def bench_load_settings_variables(workdir, loads=100):
+    """
+    Функция, подготавливающая бенчмарк чтения settings.yaml и load_settings_variables
+    :param workdir: Временный каталог
+    :param loads: Количество загрузок за запуск
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    def run():
+        for _ in range(loads):
+            vime_checkify.load_settings_variables(SettingsStore.open(SETTINGS_PATH))
+
+    return run, loads, "loads/s"
+
+
+def bench_boss_notifications(workdir, rounds=1000):
+    """
+    Функция, подготавливающая бенчмарк оповещений о боссах (бывший launch_boss_notifications):
+    планирование и срабатывание оповещений обо всех боссах и вывод табло, как в главном цикле
+    :param workdir: Временный каталог
+    :param rounds: Количество повторений за запуск
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    settings = SettingsStore.open(SETTINGS_PATH)
+    boss_respawn = BossRespawn((boss, 0.0) for boss in settings.bosses_cooldown)
+    source = SimpleNamespace(nickname="Steve", boss_respawn=boss_respawn, scheduled_respawn={})
+
+    def run():
+        with open(devnull, "w", encoding="utf-8") as sink:
+            for _ in range(rounds):
+                scheduler = Scheduler()
+                source.scheduled_respawn.clear()
+                vime_checkify.schedule_boss_reminders(scheduler, settings, boss_respawn,
+                                                      source.scheduled_respawn)
+                scheduler.run_due(1.0)
+                vime_checkify.show_boss_board(BoardView(sink, live=False), [source],
+                                              settings.colored)
+
+    return run, rounds, "rounds/s"
+
+
+def bench_boss_board(workdir, kills=10000):
+    """
+    Функция, подготавливающая бенчмарк табло: убийство босса и перерисовка изменившихся строк
+    :param workdir: Временный каталог
+    :param kills: Количество убийств за запуск
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    settings = SettingsStore.open(SETTINGS_PATH)
+    bosses_cooldown = settings.bosses_cooldown
+    bosses = list(bosses_cooldown)
+
+    def run():
+        boss_respawn = BossRespawn((boss, float(number)) for number, boss in enumerate(bosses))
+        source = SimpleNamespace(nickname="Steve", boss_respawn=boss_respawn)
+        with open(devnull, "w", encoding="utf-8") as sink:
+            view = BoardView(sink, live=True)
+            for number in range(kills):
+                boss = bosses[number % len(bosses)]
+                boss_respawn[boss] = number * 60.0 + bosses_cooldown[boss]
+                vime_checkify.show_boss_board(view, [source], settings.colored)
+
+    return run, kills, "kills/s"
+
+
+def bench_kill_index(workdir, kills=100000, queries=10):
+    """
+    Функция, подготавливающая бенчмарк запросов к индексу убийств: восстановление последних
+    убийств при запуске и оценка кулдаунов всех боссов
+    :param workdir: Временный каталог
+    :param kills: Количество убийств в индексе
+    :param queries: Количество пар запросов за запуск
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    bosses = load_boss_names()
+    bosses_cooldown = SettingsStore.open(SETTINGS_PATH).bosses_cooldown
+    kill_index = KillIndex.open(path.join(workdir, "kills.sqlite3"))
+    for number in range(kills):
+        kill_index.add(workdir, number * 60.0, bosses[number % len(bosses)])
+    kill_index.flush()
+
+    def run():
+        for _ in range(queries):
+            kill_index.latest_kills(workdir, kills * 60.0 - 86400)
+            kill_index.learned_cooldowns(bosses_cooldown)
+
+    return run, queries, "queries/s"
+
+
+def bench_replay(workdir, lines):
+    """
+    Функция, подготавливающая бенчмарк воспроизведения latest.log без ожидания: чтение
+    дописываемого latest.log, обработка строк, команды, контрольная точка и срабатывание
+    запланированных оповещений по виртуальным часам
+    :param workdir: Временный каталог
+    :param lines: Количество строк в latest.log
+    :return: Кортеж: функция запуска, количество обрабатываемых элементов, единица измерения
+    """
+    log_path = path.join(workdir, "latest")
+    if not path.exists(log_path):
+        write_logs(log_path, lines=lines)
+
+    def run():
+        replay(path.join(log_path, "latest.log"), SETTINGS_PATH, day="2026-01-01")
+
+    return run, lines, "lines/s"
+
+
+def create_benchmarks(workdir, lines, archives):
+    """
+    Функция, создающая все бенчмарки
+    :param workdir: Временный каталог
+    :param lines: Количество строк в latest.log и в каждом архиве
+    :param archives: Количество архивов
+    :return: Словарь, ключ - название бенчмарка, значение - функция его подготовки. Данные
+    для бенчмарка создаются только при вызове этой функции
+    """
+    return {REFERENCE: lambda: bench_reference(workdir, lines),
+            "processing_log": lambda: bench_processing_log(workdir, lines),
+            "processing_log_metrics": lambda: bench_processing_log(workdir, lines, True),
+            "tail_latest": lambda: bench_tail_latest(workdir, lines),
+            "processing_old_logs": lambda: bench_processing_old_logs(workdir, lines, archives,
+                                                                     False),
+            "processing_old_logs_parallel": lambda: bench_processing_old_logs(workdir, lines,
+                                                                              archives, True),
+            "latest_reverse_scan": lambda: bench_latest_reverse_scan(workdir, lines),
+            "startup": lambda: bench_startup(workdir),
+            "load_settings_variables": lambda: bench_load_settings_variables(workdir),
+            "boss_notifications": lambda: bench_boss_notifications(workdir),
+            "boss_board": lambda: bench_boss_board(workdir),
+            "kill_index": lambda: bench_kill_index(workdir),
+            "replay": lambda: bench_replay(workdir, lines)}
+
+
+def measure(run, items, repeat):
+    """
+    Функция, измеряющая пропускную способность (лучший из запусков) и пиковую память
+    текущего процесса
+    :param run: Функция запуска бенчмарка
+    :param items: Количество элементов, обрабатываемых за запуск
+    :param repeat: Количество запусков
+    :return: Кортеж: элементов в секунду, пиковая память в КиБ
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return items / best, peak / 1024
+
+
+def find_regressions(results, baselines, tolerance):
+    """
+    Функция, сравнивающая результаты с сохранёнными и с бюджетами
+    :param results: Словарь результатов текущего запуска
+    :param baselines: Словарь сохранённых результатов
+    :param tolerance: Допустимое относительное ухудшение
+    :return: Список описаний регрессий
+    """
+    regressions = []
+    for name, result in results.items():
+        if result["throughput"] < MIN_THROUGHPUT.get(name, 0):
+            regressions.append(f"{name}: {result['throughput']:,.1f} {result['unit']} "
+                               f"< бюджета {MIN_THROUGHPUT[name]}")
+        if name not in baselines:
+            continue
+        baseline = baselines[name]
+        if name != REFERENCE and result["relative"] < baseline["relative"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['relative']:.4g} от {REFERENCE} "
+                               f"< {baseline['relative']:.4g}")
+        if result["peak_memory_kib"] > baseline["peak_memory_kib"] * (1 + tolerance) + \
+                MEMORY_SLACK_KIB:
+            regressions.append(f"{name}: {result['peak_memory_kib']:,.0f} KiB "
+                               f"> {baseline['peak_memory_kib']:,.0f} KiB")
+    return regressions
+
+
+def main():
+    """
+    Функция, запускающая бенчмарки и сравнивающая результаты с сохранёнными
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Бенчмарки VimeCheckify")
+    parser.add_argument("--lines", type=int, default=200000,
+                        help="строк в latest.log и в каждом архиве")
+    parser.add_argument("--archives", type=int, default=4, help="количество архивов")
+    parser.add_argument("--repeat", type=int, default=3, help="запусков каждого бенчмарка")
+    parser.add_argument("--only", nargs="*", help="названия запускаемых бенчмарков")
+    parser.add_argument("--save", action="store_true", help="сохранить результаты как эталон")
+    parser.add_argument("--check", action="store_true", help="код 1 при регрессии")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="допустимое относительное ухудшение")
+    args = parser.parse_args()
+    vime_checkify.NOTIFIER.configure(lambda notification: None, 0, 10)
+    previous_clock = set_clock(VirtualClock(
+        datetime.combine(datetime.now().date(), time.max).timestamp()))
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, prepare in create_benchmarks(workdir, args.lines, args.archives).items():
+                if args.only and name not in args.only and name != REFERENCE:
+                    continue
+                run, items, unit = prepare()
+                throughput, peak = measure(run, items, args.repeat)
+                reference = results[REFERENCE]["throughput"] if results else throughput
+                results[name] = {"throughput": throughput, "relative": throughput / reference,
+                                 "unit": unit, "peak_memory_kib": peak}
+                print(f"{name:<30} {throughput:>14,.0f} {unit:<9} {throughput / reference:>10.4g} "
+                      f"{peak:>10,.0f} KiB")
+    finally:
+        set_clock(previous_clock)
+    baselines = {}
+    if path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, encoding="utf-8") as file:
+            baselines = json.load(file)
+    if args.save:
+        baselines.update({name: {key: float(f"{value:.4g}") if key == "relative" else
+                                 round(value) if isinstance(value, float) else value
+                                 for key, value in result.items()}
+                          for name, result in results.items()})
+        with open(BASELINES_PATH, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=4)
+            file.write("\n")
+    if args.check and (regressions := find_regressions(results, baselines, args.tolerance)):
+        print("Регрессии:", *regressions, sep="\n    ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Модуль для быстрого получения убийств боссов из уже записанных log-файлов:
+    - Архивы распаковываются и просматриваются блоками байтов в отдельных процессах,
+      декодируются только строки-кандидаты, обратно возвращаются только убийства боссов
+    - Большой latest.log просматривается с конца через mmap до нахождения всех боссов
+"""
+from os import cpu_count
+import gzip
+import mmap
+import os
+import sys
+from line_classifier import LineClassifier, BossKill, KILL_MARKER_BYTES, TIME_LENGTH, \
+    candidate_lines
+
+BLOCK_SIZE = 1 << 16
+PARALLEL_MIN_BYTES = 8 << 20
+
+
+def archive_lines(file_path, markers=(KILL_MARKER_BYTES,)):
+    """
+    Функция, читающая архивный log-файл блоками байтов и выдающая только строки-кандидаты
+    :param file_path: Путь к архиву
+    :param markers: Маркеры событий в UTF-8, по умолчанию - только убийства боссов
+    :return: Генератор декодированных строк в порядке следования в файле
+    """
+    remainder = b""
+    with gzip.open(file_path, "rb") as file:
+        while block := file.read(BLOCK_SIZE):
+            block = remainder + block
+            last_newline = block.rfind(b"\n") + 1
+            remainder = block[last_newline:]
+            yield from candidate_lines(block[:last_newline], markers)
+    yield from candidate_lines(remainder, markers)
+
+
+def scan_archive(file_path):
+    """
+    Функция, находящая все убийства боссов в архивном log-файле
+    :param file_path: Путь к архиву
+    :return: Список событий BossKill в порядке следования в файле
+    """
+    classifier = LineClassifier()
+    return [event for line in archive_lines(file_path)
+            if isinstance(event := classifier.classify(line), BossKill)]
+
+
+def scan_latest_reverse(file_path, bosses, since, classifier=None):
+    """
+    Функция, находящая последнее убийство каждого босса в log-файле просмотром с конца.
+    Просмотр останавливается, когда найдены все боссы или достигнута строка старше since
+    :param file_path: Путь к log-файлу
+    :param bosses: Имена боссов, последние убийства которых нужно найти
+    :param since: Время (timestamp), более ранние убийства не нужны
+    :param classifier: Классификатор строк, по умолчанию - без распознавания команд
+    :return: Кортеж: список событий BossKill от новых к старым, смещение в байтах сразу после
+    последней целой строки
+    """
+    classifier = classifier or LineClassifier()
+    remaining = set(bosses)
+    events = []
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return events, 0
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            lines_end = data.rfind(b"\n") + 1
+            position = data.rfind(KILL_MARKER_BYTES, 0, lines_end)
+            while position != -1 and remaining:
+                start = data.rfind(b"\n", 0, position) + 1
+                line = data[start:data.find(b"\n", position)].rstrip(b"\r").decode(
+                    "utf-8", errors="replace")
+                if len(line) >= TIME_LENGTH and \
+                        (timestamp := classifier.timestamp(line)) is not None and timestamp < since:
+                    break
+                if isinstance(event := classifier.classify(line), BossKill) and \
+                        event.name in remaining:
+                    remaining.discard(event.name)
+                    events.append(event)
+                position = data.rfind(KILL_MARKER_BYTES, 0, start)
+    return events, lines_end
+
+
+def scan_archives(file_paths, workers=None, min_bytes=PARALLEL_MIN_BYTES):
+    """
+    Функция, распределяющая архивы по пулу процессов. Архивы просматриваются в текущем процессе,
+    если их слишком мало для окупаемости запуска процессов, доступно одно ядро или приложение
+    собрано в .exe (PyInstaller)
+    :param file_paths: Пути к архивам в хронологическом порядке
+    :param workers: Количество процессов, по умолчанию - количество ядер
+    :param min_bytes: Минимальный суммарный размер архивов для параллельного просмотра
+    :return: Списки убийств для каждого архива в порядке file_paths
+    """
+    workers = min(len(file_paths), workers or cpu_count() or 1)
+    if workers < 2 or getattr(sys, "frozen", False) or \
+            sum(os.path.getsize(file_path) for file_path in file_paths) < min_bytes:
+        return [scan_archive(file_path) for file_path in file_paths]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(scan_archive, file_paths))
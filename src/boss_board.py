@@ -0,0 +1,122 @@
+"""
+Модуль для вывода времени респавна боссов:
+    - Время респавна хранится упорядоченным, обновление при убийстве не пересортировывает список
+    - Консольное табло перерисовывает на месте только изменившиеся строки
+"""
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+import sys
+
+SEPARATOR = "-" * 57
+
+
+class BossRespawn(MutableMapping):
+    """
+    Словарь, ключ - имя босса, значение - время его следующего респавна. Итерация идёт
+    в порядке респавна, место записи при изменении находится бинарным поиском
+    """
+
+    def __init__(self, items=()):
+        """
+        :param items: Начальные пары имя босса - время респавна
+        """
+        self._respawn = {}
+        self._order = []
+        self.revision = 0
+        self.update(items)
+
+    def __getitem__(self, boss):
+        return self._respawn[boss]
+
+    def __setitem__(self, boss, respawn_time):
+        if boss in self._respawn:
+            if self._respawn[boss] == respawn_time:
+                return
+            self._remove_order(boss)
+        self._respawn[boss] = respawn_time
+        insort(self._order, (respawn_time, boss))
+        self.revision += 1
+
+    def __delitem__(self, boss):
+        self._remove_order(boss)
+        del self._respawn[boss]
+        self.revision += 1
+
+    def __iter__(self):
+        return (boss for _, boss in self._order)
+
+    def __len__(self):
+        return len(self._respawn)
+
+    def _remove_order(self, boss):
+        """
+        Метод, удаляющий босса из упорядоченного списка
+        :param boss: Имя босса
+        :return: None
+        """
+        del self._order[bisect_left(self._order, (self._respawn[boss], boss))]
+
+
+class BoardView:
+    """
+    Консольное табло. В терминале строки перерисовываются на месте с помощью
+    ANSI-последовательностей управления курсором, иначе при каждом изменении табло выводится
+    целиком под разделителем
+    """
+
+    def __init__(self, stream=None, live=None):
+        """
+        :param stream: Поток вывода, по умолчанию - sys.stdout
+        :param live: Перерисовывать ли табло на месте, по умолчанию - если поток является терминалом
+        """
+        self.stream = stream or sys.stdout
+        self.live = self.stream.isatty() if live is None else live
+        self.revision = None
+        self._lines = None
+
+    def render(self, lines, revision=None):
+        """
+        Метод, выводящий табло
+        :param lines: Строки табло
+        :param revision: Версия состояния, по которому построены строки
+        :return: Количество выведенных строк
+        """
+        self.revision = revision
+        if lines == self._lines:
+            return 0
+        if self.live and self._lines is not None:
+            output, written = self._diff(self._lines, lines)
+        else:
+            output, written = "", len(lines)
+            if not self.live:
+                output = SEPARATOR + "\n"
+            output += "".join(line + "\n" for line in lines)
+        self._lines = list(lines)
+        self.stream.write(output)
+        self.stream.flush()
+        return written
+
+    @staticmethod
+    def _diff(old_lines, new_lines):
+        """
+        Метод, формирующий вывод, заменяющий только изменившиеся строки. Курсор находится
+        в начале строки, следующей за табло
+        :param old_lines: Выведенные ранее строки
+        :param new_lines: Новые строки
+        :return: Кортеж: вывод, количество перерисованных строк
+        """
+        height = len(old_lines)
+        parts = []
+        written = 0
+        for index, line in enumerate(new_lines[:height]):
+            if line != old_lines[index]:
+                parts.append(f"\033[{height - index}F\033[2K{line}\033[{height - index}E")
+                written += 1
+        for line in new_lines[height:]:
+            parts.append(line + "\n")
+            written += 1
+        if len(new_lines) < height:
+            for index in range(len(new_lines), height):
+                parts.append(f"\033[{height - index}F\033[2K\033[{height - index}E")
+            parts.append(f"\033[{height - len(new_lines)}F")
+        return "".join(parts), written
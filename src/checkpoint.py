@@ -0,0 +1,139 @@
+"""
+Модуль для сохранения прогресса обработки log-файлов между запусками:
+    - Уже обработанные архивы (название, размер, время изменения)
+    - Позиция чтения в latest.log
+Сами убийства боссов хранятся в индексе убийств (kill_index)
+"""
+from hashlib import sha1
+import json
+import os
+
+
+def checkpoint_path(log_path):
+    """
+    Функция, возвращающая путь к файлу контрольной точки для каталога логов
+    :param log_path: Каталог логов
+    :return: Путь вида checkpoint-<хеш каталога>.json
+    """
+    return f"checkpoint-{sha1(os.path.abspath(log_path).encode('utf-8')).hexdigest()[:8]}.json"
+
+
+class CheckpointStore:
+    """
+    Хранилище контрольной точки, сохраняемое в JSON-файл атомарной заменой
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: Путь к файлу контрольной точки
+        """
+        self.file_path = file_path
+        self.archives = {}
+        self.latest_inode = None
+        self.latest_offset = 0
+        self._saved = None
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Метод, загружающий контрольную точку из файла. Отсутствующий или повреждённый файл
+        даёт пустую контрольную точку
+        :param file_path: Путь к файлу контрольной точки
+        :return: CheckpointStore
+        """
+        checkpoint = cls(file_path)
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                data = json.load(file)
+            checkpoint.archives = {name: tuple(signature)
+                                   for name, signature in data["archives"].items()}
+            checkpoint.latest_inode = data["latest"]["inode"]
+            checkpoint.latest_offset = data["latest"]["offset"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return cls(file_path)
+        checkpoint._saved = checkpoint._serialize()
+        return checkpoint
+
+    @staticmethod
+    def archive_signature(file_path):
+        """
+        Метод, возвращающий признаки, по которым архив считается уже обработанным
+        :param file_path: Путь к архиву
+        :return: Кортеж размер, время изменения в наносекундах
+        """
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_archive_processed(self, name, file_path):
+        """
+        Метод, проверяющий, обрабатывался ли архив в неизменном виде
+        :param name: Название архива
+        :param file_path: Путь к архиву
+        :return: bool - обработан ли архив
+        """
+        return self.archives.get(name) == self.archive_signature(file_path)
+
+    def mark_archive(self, name, file_path):
+        """
+        Метод, отмечающий архив как обработанный
+        :param name: Название архива
+        :param file_path: Путь к архиву
+        :return: None
+        """
+        self.archives[name] = self.archive_signature(file_path)
+
+    def retain_archives(self, names):
+        """
+        Метод, забывающий архивы, которые больше не подлежат обработке
+        :param names: Названия актуальных архивов
+        :return: None
+        """
+        names = set(names)
+        self.archives = {name: signature for name, signature in self.archives.items()
+                         if name in names}
+
+    def restore_position(self, tailer):
+        """
+        Метод, переводящий чтение latest.log на сохранённую позицию, если файл не был заменён
+        или усечён с момента сохранения
+        :param tailer: Объект LogTailer, открытый на latest.log
+        :return: bool - восстановлена ли позиция
+        """
+        if tailer.inode != self.latest_inode or tailer.size < self.latest_offset:
+            return False
+        tailer.seek(self.latest_offset)
+        return True
+
+    def update(self, inode, offset):
+        """
+        Метод, запоминающий позицию, до которой обработан latest.log
+        :param inode: Inode файла latest.log
+        :param offset: Смещение в байтах после последней обработанной строки
+        :return: None
+        """
+        self.latest_inode = inode
+        self.latest_offset = offset
+
+    def _serialize(self):
+        """
+        Метод, преобразующий контрольную точку в JSON-строку
+        :return: str
+        """
+        return json.dumps({"archives": self.archives,
+                           "latest": {"inode": self.latest_inode, "offset": self.latest_offset}},
+                          ensure_ascii=False)
+
+    def save(self):
+        """
+        Метод, атомарно записывающий контрольную точку, если она изменилась с прошлой записи
+        :return: bool - была ли выполнена запись
+        """
+        data = self._serialize()
+        if data == self._saved:
+            return False
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(data)
+        os.replace(temp_path, self.file_path)
+        self._saved = data
+        return True
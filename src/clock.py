@@ -0,0 +1,75 @@
+"""
+Модуль с источником текущего времени. Всё приложение получает время через get_time, поэтому
+при воспроизведении записанных логов системные часы подменяются виртуальными
+"""
+from time import time, sleep
+
+
+class SystemClock:
+    """
+    Системные часы
+    """
+
+    def time(self):
+        """
+        Метод, возвращающий текущее время
+        :return: timestamp
+        """
+        return time()
+
+
+class VirtualClock:
+    """
+    Виртуальные часы, время которых изменяется только методом advance_to
+    """
+
+    def __init__(self, start, speed=None):
+        """
+        :param start: Начальное время (timestamp)
+        :param speed: Во сколько раз виртуальное время идёт быстрее реального,
+        None - без ожидания
+        """
+        self.now = start
+        self.speed = speed
+
+    def time(self):
+        """
+        Метод, возвращающий текущее виртуальное время
+        :return: timestamp
+        """
+        return self.now
+
+    def advance_to(self, timestamp):
+        """
+        Метод, переводящий часы вперёд. При заданной скорости ожидает соответствующее
+        реальное время
+        :param timestamp: Новое время (timestamp), более раннее время игнорируется
+        :return: None
+        """
+        if timestamp <= self.now:
+            return
+        if self.speed:
+            sleep((timestamp - self.now) / self.speed)
+        self.now = timestamp
+
+
+CLOCK = SystemClock()
+
+
+def get_time():
+    """
+    Функция, возвращающая текущее время установленных часов
+    :return: timestamp
+    """
+    return CLOCK.time()
+
+
+def set_clock(clock):
+    """
+    Функция, устанавливающая часы для всего приложения
+    :param clock: Объект с методом time
+    :return: Предыдущие часы
+    """
+    global CLOCK
+    previous, CLOCK = CLOCK, clock
+    return previous
@@ -0,0 +1,125 @@
+"""
+Модуль для хранения истории убийств боссов в SQLite:
+    - Убийства дописываются в таблицу, повторная обработка тех же строк не создаёт дубликатов
+    - Последние убийства восстанавливаются запросом без повторного чтения архивов
+    - По интервалам между убийствами оцениваются кулдауны боссов
+"""
+from itertools import pairwise
+import sqlite3
+
+KILL_INDEX_PATH = "kills.sqlite3"
+MIN_SAMPLES = 20
+COOLDOWN_QUANTILE = 0.1
+MIN_COOLDOWN = 60
+MIN_COOLDOWN_RATIO = 0.5
+
+
+class KillIndex:
+    """
+    Индекс убийств боссов, ключ записи - каталог логов, имя босса и время убийства
+    """
+
+    def __init__(self, connection):
+        """
+        :param connection: Соединение с базой данных
+        """
+        self.connection = connection
+        self._pending = []
+
+    @classmethod
+    def open(cls, file_path=KILL_INDEX_PATH):
+        """
+        Метод, открывающий (и при необходимости создающий) индекс
+        :param file_path: Путь к файлу базы данных
+        :return: KillIndex
+        """
+        connection = sqlite3.connect(file_path)
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS kills (
+                source TEXT NOT NULL,
+                boss TEXT NOT NULL,
+                time REAL NOT NULL,
+                PRIMARY KEY (source, boss, time)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS kills_boss_time ON kills (boss, time);
+        """)
+        return cls(connection)
+
+    def add(self, source, kill_time, name):
+        """
+        Метод, запоминающий убийство босса. На диск убийства записываются методом flush
+        :param source: Каталог логов, в котором найдено убийство
+        :param kill_time: Время убийства (timestamp)
+        :param name: Имя босса
+        :return: None
+        """
+        self._pending.append((source, name, kill_time))
+
+    def flush(self):
+        """
+        Метод, записывающий накопленные убийства одной транзакцией
+        :return: bool - была ли выполнена запись
+        """
+        if not self._pending:
+            return False
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO kills VALUES (?, ?, ?)",
+                                        self._pending)
+        self._pending.clear()
+        return True
+
+    def latest_kills(self, source, since):
+        """
+        Метод, возвращающий время последнего убийства каждого босса
+        :param source: Каталог логов
+        :param since: Время (timestamp), более ранние убийства не учитываются
+        :return: Словарь, ключ - имя босса, значение - время его последнего убийства
+        """
+        return dict(self.connection.execute(
+            "SELECT boss, MAX(time) FROM kills WHERE source = ? AND time >= ? GROUP BY boss",
+            (source, since)))
+
+    def respawn_intervals(self, boss):
+        """
+        Метод, возвращающий интервалы между последовательными убийствами босса
+        в каждом из каталогов логов
+        :param boss: Имя босса
+        :return: Список интервалов в секундах
+        """
+        rows = self.connection.execute(
+            "SELECT source, time FROM kills WHERE boss = ? ORDER BY source, time", (boss,))
+        return [second_time - first_time
+                for (first_source, first_time), (second_source, second_time) in pairwise(rows)
+                if first_source == second_source]
+
+    def learned_cooldowns(self, bosses_cooldown, min_samples=MIN_SAMPLES):
+        """
+        Метод, оценивающий кулдауны боссов по наблюдаемым интервалам между убийствами.
+        Интервал не меньше кулдауна (босса убивают не сразу после респавна, часть убийств
+        пропущена), поэтому берётся нижний дециль, округлённый вниз до минуты. Даже он
+        завышен на время до убийства, а поздний кулдаун делает оповещение о респавне
+        бесполезным, поэтому оценка не больше кулдауна из настроек: по истории кулдаун
+        только уточняется в меньшую сторону. Единичные аномально короткие интервалы
+        (неверное время строки, повтор сообщения) не должны задавать кулдаун, поэтому оценка
+        не меньше MIN_COOLDOWN_RATIO кулдауна из настроек и не меньше MIN_COOLDOWN
+        :param bosses_cooldown: Словарь, ключ - имя босса, значение - кулдаун из настроек
+        в секундах
+        :param min_samples: Минимальное количество интервалов для оценки
+        :return: Словарь, ключ - имя босса, значение - кулдаун в секундах
+        """
+        cooldowns = {}
+        for boss, cooldown in bosses_cooldown.items():
+            intervals = sorted(self.respawn_intervals(boss))
+            if len(intervals) >= min_samples:
+                interval = intervals[int(len(intervals) * COOLDOWN_QUANTILE)]
+                cooldowns[boss] = min(max(int(interval) // 60 * 60, MIN_COOLDOWN,
+                                          int(cooldown * MIN_COOLDOWN_RATIO)), cooldown)
+        return cooldowns
+
+    def close(self):
+        """
+        Метод, записывающий накопленные убийства и закрывающий индекс
+        :return: None
+        """
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,133 @@
+"""
+Модуль для разбора строк log-файла: строки чата однократно проверяются по префиксу,
+из подходящих извлекаются события убийства босса и команды пользователя. Строки-кандидаты
+выбираются из блоков байтов без декодирования остальных строк
+"""
+from clock import get_time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+import re
+
+TIME_LENGTH = len("[00:00:00]")
+CHAT_PREFIX = " [Client thread/INFO]: [CHAT] "
+BODY_START = TIME_LENGTH + len(CHAT_PREFIX)
+KILL_MARKER = "был"
+COMMAND_MARKER = "~"
+MIDNIGHT_TOLERANCE = 300
+CHAT_PREFIX_BYTES = CHAT_PREFIX.encode("utf-8")
+KILL_MARKER_BYTES = KILL_MARKER.encode("utf-8")
+COMMAND_MARKER_BYTES = COMMAND_MARKER.encode("utf-8")
+EVENT_MARKERS = (KILL_MARKER_BYTES, COMMAND_MARKER_BYTES)
+BOSS_PATTERN = re.compile(r"(Все )?([А-Яа-яЁё ]+) был[аи]? повержен[ыа]? за")
+
+
+def candidate_lines(block, markers=EVENT_MARKERS):
+    """
+    Функция, выбирающая из блока байтов строки чата, содержащие маркер события. Маркеры ищутся
+    по всему блоку, декодируются только найденные строки
+    :param block: Блок байтов, состоящий из целых строк
+    :param markers: Маркеры событий в UTF-8
+    :return: Список декодированных строк в порядке следования в блоке
+    """
+    lines = {}
+    for marker in markers:
+        position = block.find(marker)
+        while position != -1:
+            start = block.rfind(b"\n", 0, position) + 1
+            end = block.find(b"\n", position)
+            if end == -1:
+                end = len(block)
+            if block.startswith(CHAT_PREFIX_BYTES, start + TIME_LENGTH):
+                lines[start] = end
+            position = block.find(marker, end)
+    if len(markers) > 1:
+        lines = dict(sorted(lines.items()))
+    return [block[start:end].rstrip(b"\r").decode("utf-8", errors="replace")
+            for start, end in lines.items()]
+
+
+class BossKill(NamedTuple):
+    """
+    Событие убийства босса
+    """
+    timestamp: float
+    name: str
+
+
+class Command(NamedTuple):
+    """
+    Событие команды, отправленной пользователем в чат
+    """
+    timestamp: float
+    command: str
+    params: str
+
+
+class LineClassifier:
+    """
+    Классификатор строк log-файла, создаваемый один раз на сессию
+    """
+
+    def __init__(self, nickname=None):
+        """
+        :param nickname: Никнейм аккаунта, команды которого распознаются. None - команды
+        не распознаются (например, в архивных log-файлах)
+        """
+        self._nickname = nickname
+        self._command_pattern = None
+        if nickname is not None:
+            self._command_pattern = re.compile(fr".*{re.escape(nickname)}.*[:>] "
+                                               fr"~([-a-z+ ]+)([)(А-Яа-яЁё, \d]+)")
+        self._day_start = 0.0
+        self._next_day_start = 0.0
+
+    def _refresh_day(self, now):
+        """
+        Метод, пересчитывающий начало текущих суток, к которому прибавляется время из строки
+        :param now: Текущее время (timestamp)
+        :return: None
+        """
+        midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._day_start = midnight.timestamp()
+        self._next_day_start = (midnight + timedelta(days=1)).timestamp()
+
+    def timestamp(self, line):
+        """
+        Метод, переводящий время [HH:MM:SS] в начале строки в timestamp. Время, которое
+        ещё не наступило сегодня, относится ко вчерашнему дню (строки, записанные до полуночи)
+        :param line: Строка log-файла
+        :return: timestamp или None, если строка не начинается со времени
+        """
+        if line[0] != "[" or line[3] != ":" or line[6] != ":" or line[9] != "]":
+            return None
+        try:
+            seconds = int(line[1:3]) * 3600 + int(line[4:6]) * 60 + int(line[7:9])
+        except ValueError:
+            return None
+        now = get_time()
+        if now >= self._next_day_start:
+            self._refresh_day(now)
+        timestamp = self._day_start + seconds
+        if timestamp > now + MIDNIGHT_TOLERANCE:
+            timestamp -= 86400
+        return timestamp
+
+    def classify(self, line):
+        """
+        Метод, определяющий, содержит ли строка событие
+        :param line: Строка log-файла
+        :return: BossKill, Command или None
+        """
+        if not line.startswith(CHAT_PREFIX, TIME_LENGTH):
+            return None
+        if KILL_MARKER in line and (match := BOSS_PATTERN.match(line, BODY_START)):
+            timestamp = self.timestamp(line)
+            if timestamp is not None:
+                return BossKill(timestamp, match.group(2))
+        if self._command_pattern is not None and COMMAND_MARKER in line and \
+                self._nickname in line and \
+                (match := self._command_pattern.match(line, BODY_START)):
+            timestamp = self.timestamp(line)
+            if timestamp is not None:
+                return Command(timestamp, match.group(1)[:-1], match.group(2))
+        return None
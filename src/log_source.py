@@ -0,0 +1,231 @@
+"""
+Модуль для одновременного отслеживания нескольких каталогов логов (нескольких аккаунтов):
+у каждого источника свой поток чтения latest.log, свой никнейм и своё состояние боссов,
+новые строки передаются в общую очередь главного потока. Ошибки чтения одного источника
+передаются в ту же очередь и не мешают остальным, поток переоткрывает latest.log сам
+"""
+from contextlib import suppress
+from datetime import datetime
+from os import path
+from threading import Thread
+from time import sleep
+from typing import NamedTuple
+from backfill import scan_latest_reverse
+from boss_board import BossRespawn
+from checkpoint import CheckpointStore, checkpoint_path
+from line_classifier import LineClassifier, candidate_lines
+from log_tailer import LogTailer
+
+REOPEN_PERIOD = 5
+
+
+class LogChunk(NamedTuple):
+    """
+    Порция новых строк latest.log одного источника
+    """
+    source: "LogSource"
+    lines: list
+    inode: int
+    position: int
+
+
+class LogError(NamedTuple):
+    """
+    Ошибка чтения latest.log одного источника
+    """
+    source: "LogSource"
+    error: OSError
+
+
+def respawn_horizon(bosses_cooldown, now):
+    """
+    Функция, возвращающая время, начиная с которого убийства влияют на время респавна боссов:
+    начало текущих суток или момент, после которого любой босс ещё мог не заспавниться
+    :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
+    :param now: Текущее время (timestamp)
+    :return: timestamp
+    """
+    midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0,
+                                                   microsecond=0).timestamp()
+    return min(midnight, now - max(bosses_cooldown.values(), default=0))
+
+
+def read_nickname(log_file_path):
+    """
+    Функция, получающая никнейм аккаунта из первой строки log-файла лаунчера
+    :param log_file_path: Путь к log-файлу
+    :return: Никнейм аккаунта
+    """
+    with open(log_file_path, encoding="utf-8") as file:
+        line = file.readline()
+    return line[line.find("Setting user: ") + 14:].rstrip()
+
+
+class LogSource:
+    """
+    Каталог логов одного клиента VimeWorld
+    """
+
+    def __init__(self, log_path, kill_index, checkpoint_file=None):
+        """
+        :param log_path: Каталог логов
+        :param kill_index: Общий для всех источников индекс убийств (KillIndex)
+        :param checkpoint_file: Путь к файлу контрольной точки, по умолчанию - checkpoint_path
+        """
+        self.log_path = path.abspath(log_path)
+        self.latest_log_path = path.join(log_path, "latest.log")
+        self.checkpoint = CheckpointStore.load(checkpoint_file or checkpoint_path(log_path))
+        self.kill_index = kill_index
+        self.boss_respawn = BossRespawn()
+        self.scheduled_respawn = {}
+        self.nickname = None
+        self.classifier = None
+        self.inode = None
+        self.position = 0
+        self._tailer = None
+        self._read = None
+
+    def record_kill(self, kill_time, name):
+        """
+        Метод, добавляющий найденное в логах этого источника убийство в индекс убийств
+        :param kill_time: Время убийства (timestamp)
+        :param name: Имя босса
+        :return: None
+        """
+        self.kill_index.add(self.log_path, kill_time, name)
+
+    def restore_respawn(self, bosses_cooldown, now):
+        """
+        Метод, восстанавливающий время респавна боссов по индексу убийств. Учитываются убийства
+        за текущие сутки и все, после которых босс ещё не заспавнился
+        :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
+        :param now: Текущее время (timestamp)
+        :return: None
+        """
+        self.kill_index.flush()
+        since = respawn_horizon(bosses_cooldown, now)
+        for boss, kill_time in self.kill_index.latest_kills(self.log_path, since).items():
+            if boss in bosses_cooldown:
+                respawn_time = kill_time + bosses_cooldown[boss]
+                self.boss_respawn[boss] = max(respawn_time,
+                                              self.boss_respawn.get(boss, respawn_time))
+
+    def open_latest(self, bosses_cooldown, now):
+        """
+        Метод, открывающий latest.log с сохранённой позиции. Без действительной контрольной
+        точки latest.log просматривается с конца до последнего убийства каждого босса, и чтение
+        продолжается с конца файла: старые команды всё равно не выполняются, а для времени
+        респавна важно только последнее убийство
+        :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
+        :param now: Текущее время (timestamp)
+        :return: bool - восстановлена ли позиция из контрольной точки
+        """
+        self.nickname = read_nickname(self.latest_log_path)
+        self.classifier = LineClassifier(self.nickname)
+        if self._tailer is not None:
+            self._tailer.close()
+        self._tailer = LogTailer(self.latest_log_path, line_filter=candidate_lines)
+        if self.checkpoint.restore_position(self._tailer):
+            return True
+        kills, offset = scan_latest_reverse(self.latest_log_path, bosses_cooldown,
+                                            respawn_horizon(bosses_cooldown, now), self.classifier)
+        for kill_time, name in kills:
+            self.record_kill(kill_time, name)
+        self._tailer.seek(offset)
+        return False
+
+    def start(self, events, follow=True):
+        """
+        Метод, запускающий чтение открытого latest.log
+        :param events: Очередь, в которую передаются объекты LogChunk
+        :param follow: Запускать ли поток чтения. Без него новые строки передаются в очередь
+        вызовом poll (воспроизведение логов)
+        :return: None
+        """
+        self.inode = self._tailer.inode
+        self.position = self._tailer.position
+        self._read = (self.inode, self.position)
+        if follow:
+            Thread(target=self._run, args=(events,), name=f"log-{self.nickname}",
+                   daemon=True).start()
+
+    def poll(self, events):
+        """
+        Метод, передающий в очередь новые строки-кандидаты latest.log. Порция без строк тоже
+        передаётся, если позиция чтения изменилась, чтобы контрольная точка не отставала от файла
+        :param events: Очередь для объектов LogChunk
+        :return: None
+        """
+        lines = list(self._tailer)
+        if lines or (self._tailer.inode, self._tailer.position) != self._read:
+            self._read = (self._tailer.inode, self._tailer.position)
+            events.put(LogChunk(self, lines, *self._read))
+
+    def _run(self, events):
+        """
+        Метод потока, передающий новые строки-кандидаты в очередь сразу после их записи.
+        При ошибке чтения в очередь передаётся LogError (один раз до восстановления), а latest.log
+        переоткрывается каждые REOPEN_PERIOD секунд
+        :param events: Очередь для объектов LogChunk и LogError
+        :return: None
+        """
+        failed = False
+        while True:
+            try:
+                if failed:
+                    self._reopen(*self._read)
+                self.poll(events)
+                failed = False
+                self._tailer.wait(None)
+            except OSError as error:
+                if not failed:
+                    events.put(LogError(self, error))
+                failed = True
+                sleep(REOPEN_PERIOD)
+
+    def _reopen(self, inode, position):
+        """
+        Метод, переоткрывающий latest.log после ошибки. Тот же файл читается с прочитанной
+        позиции, новый - с начала
+        :param inode: Inode последнего прочитанного файла
+        :param position: Позиция после последней прочитанной строки
+        :return: None
+        """
+        tailer = LogTailer(self.latest_log_path, line_filter=candidate_lines)
+        if tailer.inode == inode and tailer.size >= position:
+            tailer.seek(position)
+        with suppress(OSError):
+            self._tailer.close()
+        self._tailer = tailer
+
+    def accept(self, chunk):
+        """
+        Метод, принимающий порцию строк к обработке. После ротации latest.log никнейм
+        перечитывается, так как в клиенте мог смениться аккаунт
+        :param chunk: Порция строк
+        :return: None
+        """
+        if chunk.inode != self.inode:
+            with suppress(OSError):
+                self.nickname = read_nickname(self.latest_log_path)
+                self.classifier = LineClassifier(self.nickname)
+        self.inode = chunk.inode
+        self.position = chunk.position
+
+    def save_checkpoint(self):
+        """
+        Метод, сохраняющий найденные убийства и контрольную точку с обработанной позицией.
+        Убийства записываются первыми, чтобы позиция не опережала сохранённые данные
+        :return: None
+        """
+        self.kill_index.flush()
+        self.checkpoint.update(self.inode, self.position)
+        self.checkpoint.save()
+
+    def close(self):
+        """
+        Метод, закрывающий latest.log. Используется, когда поток чтения не запускался
+        :return: None
+        """
+        if self._tailer is not None:
+            self._tailer.close()
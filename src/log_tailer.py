@@ -0,0 +1,268 @@
+"""
+Модуль для отслеживания дописываемого log-файла:
+    - Ожидание изменений через inotify (Linux) или периодическую проверку файла
+    - Обнаружение ротации и усечения файла по inode и размеру
+    - Выдача новых строк сразу после их записи
+"""
+from time import time as get_time
+from time import sleep
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+from metrics import METRICS
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | \
+               IN_CREATE | IN_DELETE
+POLL_INTERVAL = 0.1
+READ_SIZE = 1 << 20
+
+
+class InotifyWatcher:
+    """
+    Ожидание изменений в каталоге log-файла через inotify
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: Путь к отслеживаемому файлу, наблюдение ведётся за его каталогом
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch", directory)
+
+    def wait(self, timeout):
+        """
+        Метод, блокирующийся до изменения в каталоге или истечения времени ожидания
+        :param timeout: Максимальное время ожидания в секундах, None - без ограничения
+        :return: bool - произошло ли изменение
+        """
+        if timeout is not None:
+            timeout = max(timeout, 0)
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """
+        Метод, освобождающий дескриптор inotify
+        :return: None
+        """
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Ожидание изменений log-файла с помощью периодической проверки его метаданных
+    """
+
+    def __init__(self, file_path, interval=POLL_INTERVAL):
+        """
+        :param file_path: Путь к отслеживаемому файлу
+        :param interval: Интервал между проверками в секундах
+        """
+        self._file_path = file_path
+        self._interval = interval
+        self._signature = self._stat()
+
+    def _stat(self):
+        """
+        Метод, возвращающий метаданные файла, изменение которых означает новые данные
+        :return: Кортеж inode, размер, время изменения или None, если файла нет
+        """
+        try:
+            stat = os.stat(self._file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def wait(self, timeout):
+        """
+        Метод, блокирующийся до изменения файла или истечения времени ожидания
+        :param timeout: Максимальное время ожидания в секундах, None - без ограничения
+        :return: bool - произошло ли изменение
+        """
+        deadline = float("inf") if timeout is None else get_time() + timeout
+        while True:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            remaining = deadline - get_time()
+            if remaining <= 0:
+                return False
+            sleep(min(self._interval, remaining))
+
+    def close(self):
+        """
+        Метод для совместимости с InotifyWatcher
+        :return: None
+        """
+
+
+def create_watcher(file_path):
+    """
+    Функция, выбирающая способ ожидания изменений для текущей операционной системы
+    :param file_path: Путь к отслеживаемому файлу
+    :return: InotifyWatcher на Linux, иначе PollingWatcher
+    """
+    if platform.system() == "Linux":
+        try:
+            return InotifyWatcher(file_path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(file_path)
+
+
+def decode_lines(block):
+    """
+    Функция, декодирующая все строки блока байтов
+    :param block: Блок байтов, состоящий из целых строк
+    :return: Список строк
+    """
+    return [line.rstrip(b"\r").decode("utf-8", errors="replace")
+            for line in block.split(b"\n")[:-1]]
+
+
+class LogTailer:
+    """
+    Чтение дописываемого log-файла. Итерация по объекту возвращает уже записанные целые строки,
+    после ротации или усечения файл переоткрывается автоматически
+    """
+
+    def __init__(self, file_path, watcher=None, line_filter=decode_lines):
+        """
+        :param file_path: Путь к log-файлу
+        :param watcher: Объект с методами wait и close, по умолчанию выбирается create_watcher
+        :param line_filter: Функция, получающая блок байтов из целых строк и возвращающая
+        список нужных декодированных строк, по умолчанию - все строки
+        """
+        self.name = file_path
+        self._line_filter = line_filter
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._buffer = b""
+        self._watcher = watcher if watcher is not None else create_watcher(file_path)
+        self._open()
+
+    def _open(self):
+        """
+        Метод, (пере)открывающий log-файл с начала
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.name, "rb")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._offset = 0
+        self._buffer = b""
+
+    def _read_lines(self):
+        """
+        Метод, читающий новые данные блоками и возвращающий целые строки из них
+        :return: Список декодированных строк, прошедших фильтр
+        """
+        lines = []
+        while data := self._file.read(READ_SIZE):
+            self._offset += len(data)
+            if METRICS.enabled:
+                METRICS.increment("lines_scanned", data.count(b"\n"))
+            data = self._buffer + data
+            lines_end = data.rfind(b"\n") + 1
+            self._buffer = data[lines_end:]
+            lines += self._line_filter(data[:lines_end])
+        return lines
+
+    def _rotation_state(self):
+        """
+        Метод, определяющий, был ли файл заменён новым или усечён
+        :return: "rotated", "truncated" или None
+        """
+        try:
+            stat = os.stat(self.name)
+        except FileNotFoundError:
+            return None
+        if stat.st_ino != self._inode:
+            return "rotated"
+        if stat.st_size < self._offset:
+            return "truncated"
+        return None
+
+    def __iter__(self):
+        lines = self._read_lines()
+        match self._rotation_state():
+            case "rotated":
+                self._open()
+                lines += self._read_lines()
+            case "truncated":
+                self.seek(0)
+                lines += self._read_lines()
+        return iter(lines)
+
+    @property
+    def inode(self):
+        """
+        Inode открытого log-файла
+        """
+        return self._inode
+
+    @property
+    def size(self):
+        """
+        Текущий размер открытого log-файла в байтах
+        """
+        return os.fstat(self._file.fileno()).st_size
+
+    @property
+    def position(self):
+        """
+        Смещение в байтах сразу после последней прочитанной целой строки
+        """
+        return self._offset - len(self._buffer)
+
+    def seek(self, offset):
+        """
+        Метод, переводящий чтение на указанное смещение. Смещение должно указывать на начало строки
+        :param offset: Смещение в байтах от начала файла
+        :return: None
+        """
+        self._file.seek(offset)
+        self._offset = offset
+        self._buffer = b""
+
+    def wait(self, timeout):
+        """
+        Метод, ожидающий появления новых данных в log-файле
+        :param timeout: Максимальное время ожидания в секундах, None - без ограничения
+        :return: bool - произошло ли изменение
+        """
+        return self._watcher.wait(timeout)
+
+    def close(self):
+        """
+        Метод, закрывающий log-файл и наблюдатель
+        :return: None
+        """
+        self._watcher.close()
+        self._file.close()
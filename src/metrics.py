@@ -0,0 +1,258 @@
+"""
+Модуль для сбора метрик работы приложения:
+    - Счётчики и гистограммы длительностей, отключённый сбор почти ничего не стоит
+    - Выгрузка в JSON-файл или по HTTP на localhost (формат Prometheus и JSON)
+"""
+from bisect import bisect_left
+from contextlib import nullcontext
+from threading import Lock, Thread
+from time import monotonic, perf_counter
+import json
+import os
+
+METRICS_PATH = "metrics.json"
+METRICS_PORT = 9310
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+
+
+class Histogram:
+    """
+    Гистограмма наблюдаемых значений с фиксированными границами корзин
+    """
+
+    def __init__(self, bounds=BUCKETS):
+        """
+        :param bounds: Верхние границы корзин по возрастанию, последняя корзина не ограничена
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """
+        Метод, добавляющий значение в гистограмму
+        :param value: Наблюдаемое значение
+        :return: None
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        """
+        Метод, возвращающий состояние гистограммы
+        :return: Словарь с количеством, суммой, максимумом и количеством значений по корзинам
+        """
+        return {"count": self.count, "sum": self.sum, "max": self.max,
+                "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts))}
+
+
+class Timer:
+    """
+    Контекстный менеджер, добавляющий длительность блока в гистограмму
+    """
+
+    def __init__(self, metrics, name, label):
+        """
+        :param metrics: Хранилище метрик
+        :param name: Название гистограммы
+        :param label: Значение метки kind
+        """
+        self.metrics = metrics
+        self.name = name
+        self.label = label
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, perf_counter() - self.start, self.label)
+
+
+class Metrics:
+    """
+    Хранилище метрик. Пока сбор не включён, все методы сразу возвращаются
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = monotonic()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = Lock()
+
+    def enable(self):
+        """
+        Метод, включающий сбор метрик
+        :return: None
+        """
+        self.enabled = True
+        self.started = monotonic()
+
+    def increment(self, name, value=1, label=None):
+        """
+        Метод, увеличивающий счётчик
+        :param name: Название счётчика
+        :param value: Величина увеличения
+        :param label: Значение метки kind
+        :return: None
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name, label] = self._counters.get((name, label), 0) + value
+
+    def observe(self, name, value, label=None):
+        """
+        Метод, добавляющий значение в гистограмму
+        :param name: Название гистограммы
+        :param value: Наблюдаемое значение
+        :param label: Значение метки kind
+        :return: None
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if (histogram := self._histograms.get((name, label))) is None:
+                histogram = self._histograms[name, label] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name, label=None):
+        """
+        Метод, возвращающий контекстный менеджер, измеряющий длительность блока
+        :param name: Название гистограммы
+        :param label: Значение метки kind
+        :return: Timer или пустой контекстный менеджер, если сбор не включён
+        """
+        if not self.enabled:
+            return nullcontext()
+        return Timer(self, name, label)
+
+    def counted(self, name, iterable, label=None):
+        """
+        Метод, подсчитывающий элементы, полученные из итерируемого объекта
+        :param name: Название счётчика
+        :param iterable: Итерируемый объект
+        :param label: Значение метки kind
+        :return: Итерируемый объект с теми же элементами
+        """
+        if not self.enabled:
+            return iterable
+        return self._counted(name, iterable, label)
+
+    def _counted(self, name, iterable, label):
+        """
+        Генератор, увеличивающий счётчик на количество выданных элементов по окончании итерации
+        :param name: Название счётчика
+        :param iterable: Итерируемый объект
+        :param label: Значение метки kind
+        :return: Генератор элементов
+        """
+        count = 0
+        try:
+            for count, item in enumerate(iterable, 1):
+                yield item
+        finally:
+            self.increment(name, count, label)
+
+    def snapshot(self):
+        """
+        Метод, возвращающий значения всех метрик
+        :return: Словарь, пригодный для сериализации в JSON
+        """
+        with self._lock:
+            return {"uptime_seconds": monotonic() - self.started,
+                    "counters": [{"name": name, "kind": label, "value": value}
+                                 for (name, label), value in self._counters.items()],
+                    "histograms": [{"name": name, "kind": label, **histogram.snapshot()}
+                                   for (name, label), histogram in self._histograms.items()]}
+
+    def prometheus(self):
+        """
+        Метод, форматирующий метрики в текстовом формате Prometheus
+        :return: str
+        """
+        snapshot = self.snapshot()
+        lines = [f"vime_uptime_seconds {snapshot['uptime_seconds']}"]
+        for counter in snapshot["counters"]:
+            lines.append(f"vime_{counter['name']}_total{_labels(counter['kind'])} "
+                         f"{counter['value']}")
+        for histogram in snapshot["histograms"]:
+            name, kind = f"vime_{histogram['name']}", histogram["kind"]
+            total = 0
+            for bound, count in histogram["buckets"].items():
+                total += count
+                lines.append(f"{name}_bucket{_labels(kind, le=bound)} {total}")
+            lines.append(f"{name}_sum{_labels(kind)} {histogram['sum']}")
+            lines.append(f"{name}_count{_labels(kind)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path=METRICS_PATH):
+        """
+        Метод, атомарно записывающий метрики в JSON-файл
+        :param file_path: Путь к файлу
+        :return: None
+        """
+        temp_path = file_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, ensure_ascii=False, indent=4)
+        os.replace(temp_path, file_path)
+
+
+def _labels(kind, **extra):
+    """
+    Функция, форматирующая метки метрики Prometheus
+    :param kind: Значение метки kind или None
+    :param extra: Дополнительные метки
+    :return: Строка вида {kind="mine",le="0.1"} или пустая строка
+    """
+    labels = {"kind": kind, **extra} if kind is not None else extra
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def serve_metrics(metrics, port=METRICS_PORT):
+    """
+    Функция, запускающая HTTP-сервер метрик на localhost в отдельном потоке:
+    /metrics - формат Prometheus, /metrics.json - JSON
+    :param metrics: Хранилище метрик
+    :param port: Порт
+    :return: ThreadingHTTPServer, остановка - методом shutdown
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match self.path:
+                case "/metrics":
+                    body = metrics.prometheus()
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                case "/metrics.json":
+                    body = json.dumps(metrics.snapshot(), ensure_ascii=False)
+                    content_type = "application/json; charset=utf-8"
+                case _:
+                    self.send_error(404)
+                    return
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+METRICS = Metrics()
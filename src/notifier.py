@@ -0,0 +1,145 @@
+"""
+Модуль для показа оповещений в отдельном потоке:
+    - Очередь оповещений, обработка которой не блокирует разбор логов
+    - Объединение одинаковых оповещений в пределах окна времени
+    - Ограничение частоты показа
+    - Сменные способы показа (Windows, консоль, файл)
+"""
+from time import monotonic, sleep
+from datetime import datetime
+from queue import Queue
+from threading import Lock, Thread
+from typing import NamedTuple
+from clock import get_time
+from metrics import METRICS
+
+NOTIFICATIONS_LOG_PATH = "notifications.log"
+
+
+class Notification(NamedTuple):
+    """
+    Всплывающее оповещение
+    """
+    title: str
+    message: str
+    icon: str
+    duration: int
+    created: float
+
+
+def console_backend(notification):
+    """
+    Функция, выводящая оповещение в консоль
+    :param notification: Оповещение
+    :return: None
+    """
+    print(f"[{datetime.fromtimestamp(notification.created).strftime('%H:%M:%S')}] "
+          f"{notification.title}: {notification.message}")
+
+
+class FileBackend:
+    """
+    Запись оповещений в текстовый файл
+    """
+
+    def __init__(self, file_path=NOTIFICATIONS_LOG_PATH):
+        """
+        :param file_path: Путь к файлу, в который дописываются оповещения
+        """
+        self.file_path = file_path
+
+    def __call__(self, notification):
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(f"[{datetime.fromtimestamp(notification.created).strftime('%H:%M:%S')}] "
+                       f"{notification.title}: {notification.message}\n")
+
+
+class NotificationDispatcher:
+    """
+    Очередь оповещений, показываемых в отдельном потоке
+    """
+
+    def __init__(self, backend=console_backend, interval=0.1, coalesce_window=10):
+        """
+        :param backend: Функция, показывающая одно оповещение
+        :param interval: Минимальный интервал между показами оповещений в секундах
+        :param coalesce_window: Окно в секундах, в пределах которого одинаковые оповещения
+        показываются один раз
+        """
+        self.backend = backend
+        self.interval = interval
+        self.coalesce_window = coalesce_window
+        self._queue = Queue()
+        self._recent = {}
+        self._lock = Lock()
+        self._thread = None
+
+    def configure(self, backend, interval, coalesce_window):
+        """
+        Метод, изменяющий параметры показа оповещений
+        :param backend: Функция, показывающая одно оповещение
+        :param interval: Минимальный интервал между показами оповещений в секундах
+        :param coalesce_window: Окно объединения одинаковых оповещений в секундах
+        :return: None
+        """
+        self.backend = backend
+        self.interval = interval
+        self.coalesce_window = coalesce_window
+
+    def start(self):
+        """
+        Метод, запускающий поток показа оповещений
+        :return: None
+        """
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="notifier", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Метод, показывающий оставшиеся в очереди оповещения и останавливающий поток
+        :param timeout: Максимальное время ожидания в секундах
+        :return: None
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, title="", message="", icon="", duration=3):
+        """
+        Метод, ставящий оповещение в очередь без ожидания его показа
+        :param title: Заголовок оповещения
+        :param message: Текст оповещения
+        :param icon: Путь к иконке оповещения
+        :param duration: Длительность оповещения
+        :return: bool - поставлено ли оповещение в очередь (False - объединено с одинаковым)
+        """
+        now = get_time()
+        key = (title, message)
+        with self._lock:
+            if now - self._recent.get(key, -self.coalesce_window) < self.coalesce_window:
+                return False
+            self._recent[key] = now
+            if len(self._recent) > 1024:
+                self._recent = {key: created for key, created in self._recent.items()
+                                if now - created < self.coalesce_window}
+        self._queue.put(Notification(title, message, icon, duration, now))
+        return True
+
+    def _run(self):
+        """
+        Метод потока, показывающий оповещения из очереди с ограничением частоты
+        :return: None
+        """
+        last_shown = -self.interval
+        while (notification := self._queue.get()) is not None:
+            if (delay := last_shown + self.interval - monotonic()) > 0:
+                sleep(delay)
+            try:
+                with METRICS.timer("notification_show_seconds"):
+                    self.backend(notification)
+            except Exception as error:
+                print(f"Не удалось показать оповещение '{notification.message}': {error}")
+            last_shown = monotonic()
+            METRICS.observe("notification_latency_seconds", get_time() - notification.created)
@@ -0,0 +1,231 @@
+"""
+Воспроизведение записанного или сгенерированного log-файла через настоящую обработку
+(чтение latest.log, классификатор, команды, планировщик, оповещения) с виртуальными часами:
+    - Строки дописываются во временный latest.log по секундам записи и читаются тем же
+      источником логов и той же итерацией главного цикла, что и в приложении
+    - В реальном времени, ускоренно в N раз или без ожидания
+    - Отчёт: время каждого оповещения по виртуальным часам и пропускная способность
+    - Сравнение оповещений с сохранённым отчётом для поиска регрессий
+"""
+from datetime import datetime
+from itertools import chain
+from os import path
+from queue import Queue
+from time import perf_counter, time
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+from clock import VirtualClock, set_clock
+from kill_index import KillIndex
+from line_classifier import TIME_LENGTH
+from log_source import LogSource
+from notifier import NotificationDispatcher
+from scheduler import Scheduler
+from settings_store import SettingsStore
+import vime_checkify
+
+
+def read_lines(file_path):
+    """
+    Функция, читающая строки log-файла или архива .gz без декодирования
+    :param file_path: Путь к файлу
+    :return: Генератор строк (bytes) вместе с символами перевода строки
+    """
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rb") as file:
+        yield from file
+
+
+def line_seconds(line):
+    """
+    Функция, переводящая время [HH:MM:SS] в начале строки в секунды от начала суток
+    :param line: Строка log-файла (bytes)
+    :return: Количество секунд или None, если строка не начинается со времени
+    """
+    if len(line) < TIME_LENGTH or line[:1] != b"[" or line[9:10] != b"]":
+        return None
+    try:
+        return int(line[1:3]) * 3600 + int(line[4:6]) * 60 + int(line[7:9])
+    except ValueError:
+        return None
+
+
+def timeline(lines, day_start):
+    """
+    Функция, группирующая строки по секундам записи. Уменьшение времени больше чем на 12 часов
+    считается переходом через полночь
+    :param lines: Строки log-файла (bytes)
+    :param day_start: Начало суток первой строки (timestamp)
+    :return: Генератор кортежей: время записи (timestamp), список строк
+    """
+    group, group_time, previous = [], day_start, None
+    for line in lines:
+        if (seconds := line_seconds(line)) is not None:
+            if previous is not None and seconds < previous - 43200:
+                day_start += 86400
+            previous = seconds
+            if day_start + seconds != group_time and group:
+                yield group_time, group
+                group = []
+            group_time = day_start + seconds
+        group.append(line)
+    if group:
+        yield group_time, group
+
+
+def run_until(clock, timestamp, scheduler, settings, kill_index, sources, events, variables):
+    """
+    Функция, выполняющая итерации главного цикла без ожидания: сразу и в момент каждого
+    запланированного до указанного времени события, переводя часы на его время
+    :param clock: Виртуальные часы
+    :param timestamp: Время (timestamp)
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param kill_index: Индекс убийств (KillIndex)
+    :param sources: Список источников логов (LogSource)
+    :param events: Очередь объектов LogChunk
+    :param variables: Кортеж переменных настроек
+    :return: Кортеж переменных настроек после последней итерации
+    """
+    while True:
+        variables = vime_checkify.run_iteration(scheduler, settings, kill_index, sources, events,
+                                                variables, timeout=0, save_checkpoints=False)
+        if (deadline := scheduler.next_deadline()) is None or deadline > timestamp:
+            return variables
+        clock.advance_to(deadline)
+
+
+def replay(file_path, settings_path, speed=None, day=None, nickname=None):
+    """
+    Функция, воспроизводящая log-файл. Настройки, индекс убийств и контрольная точка
+    создаются во временном каталоге и удаляются после воспроизведения. Контрольная точка
+    сохраняется один раз в конце, а не после каждой порции строк
+    :param file_path: Путь к latest.log или архиву .gz
+    :param settings_path: Путь к settings.yaml, используется его копия
+    :param speed: Во сколько раз быстрее реального времени, None - без ожидания
+    :param day: Дата первой строки в формате YYYY-MM-DD, по умолчанию - сегодня
+    :param nickname: Никнейм, команды которого выполняются, по умолчанию - из первой строки
+    :return: Словарь с отчётом
+    """
+    if day is None:
+        day = datetime.fromtimestamp(time()).strftime("%Y-%m-%d")
+    day_start = datetime.strptime(day, "%Y-%m-%d").timestamp()
+    groups = timeline(read_lines(file_path), day_start)
+    first_time, first_group = next(groups, (day_start, []))
+    if nickname is None:
+        header, first_group = first_group[:1], first_group[1:]
+    else:
+        header = [f"[00:00:00] [Client thread/INFO]: Setting user: {nickname}\n".encode("utf-8")]
+    notifications = []
+    clock = VirtualClock(first_time, speed)
+    previous_clock = set_clock(clock)
+    previous_notifier = vime_checkify.NOTIFIER
+    lines = len(header)
+    with tempfile.TemporaryDirectory() as workdir:
+        log_path = path.join(workdir, "logs")
+        os.mkdir(log_path)
+        with open(path.join(log_path, "latest.log"), "wb") as log_file:
+            log_file.writelines(header)
+        settings = SettingsStore.open(shutil.copy(settings_path,
+                                                  path.join(workdir, "settings.yaml")))
+        settings.clear_mine_notifications()
+        settings.flush()
+        kill_index = KillIndex.open(path.join(workdir, "kills.sqlite3"))
+        source = LogSource(log_path, kill_index, path.join(workdir, "checkpoint.json"))
+        vime_checkify.NOTIFIER = NotificationDispatcher(notifications.append, 0,
+                                                        settings.notification_coalesce)
+        vime_checkify.NOTIFIER.start()
+        started = perf_counter()
+        try:
+            variables = vime_checkify.load_settings_variables(settings, kill_index)
+            bosses_cooldown, notification_duration, _, _ = variables
+            events = Queue()
+            vime_checkify.start_source(source, events, bosses_cooldown, notification_duration,
+                                       follow=False)
+            scheduler = Scheduler()
+            vime_checkify.schedule_service_reminder(scheduler, settings)
+            state = (scheduler, settings, kill_index, [source], events)
+            with open(path.join(log_path, "latest.log"), "ab", buffering=0) as log_file:
+                for timestamp, group in chain([(first_time, first_group)], groups):
+                    variables = run_until(clock, timestamp, *state, variables)
+                    clock.advance_to(timestamp)
+                    log_file.write(b"".join(group))
+                    source.poll(events)
+                    variables = vime_checkify.run_iteration(*state, variables, timeout=0,
+                                                            save_checkpoints=False)
+                    lines += len(group)
+            run_until(clock, clock.now, *state, variables)
+        finally:
+            source.close()
+            if source.inode is not None:
+                source.save_checkpoint()
+            kill_index.close()
+            vime_checkify.NOTIFIER.stop()
+            vime_checkify.NOTIFIER = previous_notifier
+            set_clock(previous_clock)
+    wall_seconds = perf_counter() - started
+    return {"lines": lines,
+            "log_seconds": clock.now - day_start,
+            "wall_seconds": wall_seconds,
+            "lines_per_second": lines / wall_seconds if wall_seconds else 0.0,
+            "notifications": [{"time": datetime.fromtimestamp(notification.created)
+                               .strftime("%Y-%m-%d %H:%M:%S"),
+                               "title": notification.title, "message": notification.message}
+                              for notification in notifications]}
+
+
+def compare_notifications(report, expected):
+    """
+    Функция, сравнивающая оповещения отчёта с сохранёнными
+    :param report: Отчёт текущего воспроизведения
+    :param expected: Сохранённый отчёт
+    :return: Описание первого расхождения или None
+    """
+    actual, expected = report["notifications"], expected["notifications"]
+    for number, (got, wanted) in enumerate(zip(actual, expected), 1):
+        if got != wanted:
+            return f"оповещение {number}: {got} вместо {wanted}"
+    if len(actual) != len(expected):
+        return f"оповещений {len(actual)} вместо {len(expected)}"
+    return None
+
+
+def main():
+    """
+    Функция, разбирающая аргументы командной строки и воспроизводящая log-файл
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Воспроизведение log-файлов VimeWorld")
+    parser.add_argument("log", help="latest.log или архив .gz")
+    parser.add_argument("--settings", default="settings.yaml", help="файл с настройками")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="во сколько раз быстрее реального времени, 0 - без ожидания")
+    parser.add_argument("--date", help="дата первой строки YYYY-MM-DD, по умолчанию - сегодня")
+    parser.add_argument("--nickname", help="никнейм, по умолчанию - из первой строки")
+    parser.add_argument("--save", help="сохранить отчёт в JSON-файл")
+    parser.add_argument("--check", help="сравнить оповещения с сохранённым отчётом")
+    parser.add_argument("--verbose", action="store_true", help="вывести все оповещения")
+    args = parser.parse_args()
+    report = replay(args.log, args.settings, args.speed or None, args.date, args.nickname)
+    if args.verbose:
+        for notification in report["notifications"]:
+            print(f"[{notification['time']}] {notification['title']}: {notification['message']}")
+    print(f"Строк: {report['lines']:,}, оповещений: {len(report['notifications']):,}")
+    print(f"Время лога: {report['log_seconds']:,.0f} с, реальное: {report['wall_seconds']:,.2f} с, "
+          f"{report['lines_per_second']:,.0f} строк/с")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+    if args.check:
+        with open(args.check, encoding="utf-8") as file:
+            if mismatch := compare_notifications(report, json.load(file)):
+                print("Регрессия:", mismatch)
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
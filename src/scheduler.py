@@ -0,0 +1,79 @@
+"""
+Модуль для планирования напоминаний по абсолютному времени: события хранятся в куче
+по времени срабатывания, главный цикл спит ровно до ближайшего из них
+"""
+import heapq
+from itertools import count
+from operator import itemgetter
+
+
+class Scheduler:
+    """
+    Планировщик событий на основе кучи с минимальным временем срабатывания на вершине.
+    У каждого события есть ключ, повторное планирование по тому же ключу заменяет событие
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = count()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, deadline, callback):
+        """
+        Метод, планирующий событие
+        :param key: Ключ события
+        :param deadline: Время срабатывания (timestamp)
+        :param callback: Функция, вызываемая с временем срабатывания в качестве аргумента
+        :return: None
+        """
+        self.cancel(key)
+        entry = [deadline, next(self._counter), key, callback]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, key):
+        """
+        Метод, отменяющий событие. Отменённая запись удаляется из кучи при её извлечении
+        :param key: Ключ события
+        :return: bool - было ли событие запланировано
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = None
+        return True
+
+    def pending(self):
+        """
+        Метод, возвращающий запланированные события в порядке срабатывания
+        :return: Список кортежей: время срабатывания (timestamp), ключ события
+        """
+        entries = sorted(self._entries.values(), key=itemgetter(0, 1))
+        return [(deadline, key) for deadline, _, key, _ in entries]
+
+    def next_deadline(self):
+        """
+        Метод, возвращающий время ближайшего события
+        :return: timestamp или None, если событий нет
+        """
+        while self._heap and self._heap[0][3] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now):
+        """
+        Метод, выполняющий все события, время которых наступило. События, запланированные
+        во время выполнения на уже наступившее время, тоже выполняются
+        :param now: Текущее время (timestamp)
+        :return: Количество выполненных событий
+        """
+        executed = 0
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, _, key, callback = heapq.heappop(self._heap)
+            del self._entries[key]
+            callback(deadline)
+            executed += 1
+        return executed
@@ -0,0 +1,348 @@
+"""
+Модуль для хранения настроек в памяти на протяжении всей сессии:
+    - Команды изменяют настройки в памяти, на диск изменения записываются одной атомарной записью
+    - Внешние изменения файла обнаруживаются по времени его изменения, файл с ошибкой
+      не применяется
+    - Разобранные настройки кэшируются в JSON, пока YAML-файл не изменится, модуль yaml
+      импортируется только при разборе или записи YAML
+"""
+import json
+import os
+from metrics import METRICS
+
+SETTINGS_PATH = "settings.yaml"
+SETTINGS_ENCODING = "windows-1251"
+CACHE_SUFFIX = ".cache.json"
+METRICS_MODES = ("off", "file", "http")
+API_MODES = ("off", "on", "daemon")
+
+
+def parse_mode(name, value, modes):
+    """
+    Функция, проверяющая значение параметра-режима. YAML 1.1 читает off/on без кавычек как
+    False/True, поэтому они приводятся обратно к строкам
+    :param name: Название параметра
+    :param value: Значение из файла настроек
+    :param modes: Допустимые значения
+    :return: str
+    """
+    match value:
+        case False:
+            value = "off"
+        case True:
+            value = "on"
+    if value not in modes:
+        raise ValueError(f"Недопустимое значение {name}: {value!r}, "
+                         f"допустимые значения: {', '.join(modes)}")
+    return value
+
+
+def validate_settings(data):
+    """
+    Функция, проверяющая структуру настроек, без которой приложение не может работать
+    :param data: Разобранный файл настроек
+    :return: None
+    """
+    if not isinstance(data, dict):
+        raise ValueError("файл должен состоять из параметров вида название: значение")
+    for name in ("bosses_cooldown", "mines_cooldown"):
+        cooldowns = data.get(name)
+        if not isinstance(cooldowns, dict) or \
+                not all(isinstance(cooldown, (int, float)) for cooldown in cooldowns.values()):
+            raise ValueError(f"{name} должен быть списком название: кулдаун")
+    if not isinstance(data.get("notification_duration"), (int, float)):
+        raise ValueError("notification_duration должен быть числом")
+    if not isinstance(data.get("colored"), bool):
+        raise ValueError("colored должен быть true или false")
+    for name in ("blacklist", "mines_notifications", "log_paths"):
+        if not isinstance(data.get(name, []), (list, type(None))):
+            raise ValueError(f"{name} должен быть списком")
+    parse_mode("metrics", data.get("metrics", "off"), METRICS_MODES)
+    parse_mode("api", data.get("api", "off"), API_MODES)
+
+
+class SettingsStore:
+    """
+    Настройки приложения, загруженные из YAML-файла
+    """
+
+    def __init__(self, file_path=SETTINGS_PATH):
+        """
+        :param file_path: Путь к файлу с настройками
+        """
+        self.file_path = file_path
+        self.cache_path = file_path + CACHE_SUFFIX
+        self.data = {}
+        self.dirty = False
+        self._mtime_ns = None
+        self._rejected_mtime_ns = None
+
+    @classmethod
+    def open(cls, file_path=SETTINGS_PATH):
+        """
+        Метод, создающий хранилище и загружающий в него настройки из файла
+        :param file_path: Путь к файлу с настройками
+        :return: SettingsStore
+        """
+        settings = cls(file_path)
+        settings.load()
+        return settings
+
+    def load(self):
+        """
+        Метод, (пере)читывающий настройки из кэша, если файл не менялся с его записи,
+        иначе из файла. При ошибке настройки в памяти не изменяются
+        :return: None
+        """
+        stat = os.stat(self.file_path)
+        if (data := self._read_cache(stat)) is None:
+            import yaml
+            with open(self.file_path, encoding=SETTINGS_ENCODING) as file:
+                stat = os.fstat(file.fileno())
+                try:
+                    data = yaml.safe_load(file)
+                except (yaml.YAMLError, UnicodeDecodeError) as error:
+                    mark = getattr(error, "problem_mark", None)
+                    where = f" в строке {mark.line + 1}" if mark is not None else ""
+                    raise ValueError(f"ошибка разбора YAML{where}: "
+                                     f"{getattr(error, 'problem', None) or error}") from error
+            validate_settings(data)
+            self._write_cache(stat, data)
+        self._mtime_ns = stat.st_mtime_ns
+        self.data = data
+        self.dirty = False
+
+    def _read_cache(self, stat):
+        """
+        Метод, читающий кэш разобранных настроек
+        :param stat: Результат os.stat файла настроек
+        :return: Словарь настроек или None, если кэша нет или он устарел
+        """
+        try:
+            with open(self.cache_path, encoding="utf-8") as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict) or \
+                cache.get("signature") != [stat.st_mtime_ns, stat.st_size]:
+            return None
+        return cache.get("data")
+
+    def _write_cache(self, stat, data):
+        """
+        Метод, атомарно записывающий кэш разобранных настроек. Ошибка записи не мешает работе
+        :param stat: Результат os.stat файла настроек, по которому проверяется актуальность кэша
+        :param data: Словарь настроек
+        :return: None
+        """
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"signature": [stat.st_mtime_ns, stat.st_size], "data": data}, file,
+                          ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def reload_if_changed(self):
+        """
+        Метод, перечитывающий настройки, если файл был изменён извне. Несохранённые изменения
+        в памяти имеют приоритет. Если файла нет или он содержит ошибку, остаются прежние
+        настройки, а ошибка возбуждается один раз для каждой версии файла: следующее
+        сохранение файла снова будет прочитано
+        :return: bool - были ли настройки перечитаны
+        """
+        if self.dirty:
+            return False
+        try:
+            mtime_ns = os.stat(self.file_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = -1
+        if mtime_ns in (self._mtime_ns, self._rejected_mtime_ns):
+            return False
+        try:
+            self.load()
+        except (OSError, ValueError):
+            self._rejected_mtime_ns = mtime_ns
+            raise
+        self._rejected_mtime_ns = None
+        return True
+
+    def flush(self):
+        """
+        Метод, атомарно записывающий изменённые настройки в файл (временный файл и замена)
+        :return: bool - была ли выполнена запись
+        """
+        if not self.dirty:
+            return False
+        import yaml
+        temp_path = self.file_path + ".tmp"
+        with METRICS.timer("settings_flush_seconds"):
+            with open(temp_path, "w", encoding=SETTINGS_ENCODING) as file:
+                yaml.safe_dump(self.data, file, indent=4, allow_unicode=True, sort_keys=False)
+            os.replace(temp_path, self.file_path)
+        stat = os.stat(self.file_path)
+        self._mtime_ns = stat.st_mtime_ns
+        self._write_cache(stat, self.data)
+        self.dirty = False
+        return True
+
+    @property
+    def bosses_cooldown(self):
+        """
+        Словарь, ключ - имя босса, значение - его кулдаун в секундах
+        """
+        return {name: cooldown * 60 for name, cooldown in self.data["bosses_cooldown"].items()}
+
+    @property
+    def blacklist(self):
+        """
+        Список боссов, о которых не будут присылаться оповещения
+        """
+        return self.data.get("blacklist", [])
+
+    @property
+    def notification_duration(self):
+        """
+        Длительность одного оповещения в секундах
+        """
+        return self.data["notification_duration"]
+
+    @property
+    def mines_cooldown(self):
+        """
+        Словарь, ключ - название шахты, значение - её кулдаун в секундах
+        """
+        return self.data["mines_cooldown"]
+
+    @property
+    def colored(self):
+        """
+        Булевое значение, нужно ли использовать цветные названия
+        """
+        return self.data["colored"]
+
+    @property
+    def notification_backend(self):
+        """
+        Способ показа оповещений: auto, console или file
+        """
+        return self.data.get("notification_backend", "auto")
+
+    @property
+    def notification_interval(self):
+        """
+        Минимальный интервал между показами оповещений в секундах
+        """
+        return self.data.get("notification_interval", 0.1)
+
+    @property
+    def notification_coalesce(self):
+        """
+        Окно в секундах, в пределах которого одинаковые оповещения показываются один раз
+        """
+        return self.data.get("notification_coalesce", 10)
+
+    @property
+    def metrics(self):
+        """
+        Выгрузка метрик: off (сбор отключён), file (metrics.json) или http (localhost)
+        """
+        return parse_mode("metrics", self.data.get("metrics", "off"), METRICS_MODES)
+
+    @property
+    def metrics_port(self):
+        """
+        Порт HTTP-сервера метрик на localhost
+        """
+        return self.data.get("metrics_port", 9310)
+
+    @property
+    def api(self):
+        """
+        Локальное API состояния: off (отключено), on (вместе с табло) или daemon (без табло)
+        """
+        return parse_mode("api", self.data.get("api", "off"), API_MODES)
+
+    @property
+    def api_port(self):
+        """
+        Порт API состояния на localhost
+        """
+        return self.data.get("api_port", 9311)
+
+    @property
+    def learned_cooldowns(self):
+        """
+        Булевое значение, нужно ли оценивать кулдауны боссов по истории их убийств
+        """
+        return self.data.get("learned_cooldowns", False)
+
+    @property
+    def log_paths(self):
+        """
+        Список каталогов логов отслеживаемых клиентов, None - только каталог по умолчанию
+        """
+        return self.data.get("log_paths")
+
+    @property
+    def mines_notifications(self):
+        """
+        Список шахт для оповещения
+        """
+        return self.data.get("mines_notifications", [])
+
+    def set_notification_duration(self, duration):
+        """
+        Метод, изменяющий длительность оповещения
+        :param duration: Длительность одного оповещения в секундах
+        :return: None
+        """
+        self.data["notification_duration"] = duration
+        self.dirty = True
+
+    def add_boss(self, name, cooldown):
+        """
+        Метод, добавляющий босса или изменяющий его кулдаун
+        :param name: Имя босса
+        :param cooldown: Кулдаун респавна в минутах
+        :return: None
+        """
+        self.data["bosses_cooldown"][name] = cooldown
+        self.dirty = True
+
+    def add_to_blacklist(self, names):
+        """
+        Метод, добавляющий боссов в чёрный список
+        :param names: Список имён боссов
+        :return: None
+        """
+        self.data["blacklist"] = self.data.get("blacklist", []) + names
+        self.dirty = True
+
+    def remove_from_blacklist(self, names):
+        """
+        Метод, удаляющий боссов из чёрного списка
+        :param names: Список имён боссов
+        :return: None
+        """
+        self.data["blacklist"] = [name for name in self.blacklist if name not in names]
+        self.dirty = True
+
+    def add_mine_notification(self, name):
+        """
+        Метод, добавляющий шахту в список для оповещения
+        :param name: Название шахты
+        :return: None
+        """
+        self.data["mines_notifications"] = self.mines_notifications + [name]
+        self.dirty = True
+
+    def clear_mine_notifications(self):
+        """
+        Метод, очищающий список шахт для оповещения
+        :return: None
+        """
+        if "mines_notifications" in self.data:
+            del self.data["mines_notifications"]
+            self.dirty = True
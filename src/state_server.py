@@ -0,0 +1,159 @@
+"""
+Модуль с локальным API состояния приложения для других программ (оверлеи, боты, скрипты):
+    - TCP-сервер на localhost, запросы - строки с командой, ответы - JSON по одному на строку
+    - snapshot - текущее состояние, subscribe - состояние сразу и после каждого изменения
+    - Медленный подписчик получает только последнее состояние, промежуточные пропускаются
+"""
+from queue import Queue, Empty
+from threading import Lock, Thread
+import json
+import platform
+import socket
+import sys
+
+STATE_PORT = 9311
+STOP = object()
+
+
+def encode(message):
+    """
+    Функция, кодирующая сообщение в строку JSON
+    :param message: Сообщение, пригодное для сериализации в JSON
+    :return: bytes с символом перевода строки в конце
+    """
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+class StateServer:
+    """
+    Сервер, раздающий клиентам последнее опубликованное состояние
+    """
+
+    def __init__(self, port=STATE_PORT):
+        """
+        :param port: Порт на localhost
+        """
+        self.port = port
+        self.state = None
+        self._subscribers = set()
+        self._lock = Lock()
+        self._server = None
+
+    def start(self):
+        """
+        Метод, запускающий сервер в отдельном потоке. На Windows SO_REUSEADDR позволяет второму
+        экземпляру приложения занять тот же порт, поэтому там порт занимается эксклюзивно
+        :return: None
+        """
+        from socketserver import StreamRequestHandler, ThreadingTCPServer
+        state_server = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self):
+                try:
+                    for line in self.rfile:
+                        match command := line.decode("utf-8", errors="replace").strip():
+                            case "snapshot":
+                                self.wfile.write(encode(state_server.state))
+                            case "subscribe":
+                                state_server.stream(self.wfile)
+                                return
+                            case "":
+                                continue
+                            case _:
+                                error = f"неизвестная команда {command}"
+                                self.wfile.write(encode({"error": error}))
+                except OSError:
+                    pass
+
+        class Server(ThreadingTCPServer):
+            allow_reuse_address = platform.system() != "Windows"
+            daemon_threads = True
+
+            def server_bind(self):
+                if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+                    self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+                super().server_bind()
+
+        self._server = Server(("127.0.0.1", self.port), Handler)
+        Thread(target=self._server.serve_forever, name="state", daemon=True).start()
+
+    def stream(self, file):
+        """
+        Метод, отправляющий подписчику текущее состояние и все последующие до отключения
+        клиента или остановки сервера
+        :param file: Файловый объект соединения с клиентом
+        :return: None
+        """
+        updates = Queue(maxsize=1)
+        with self._lock:
+            updates.put_nowait(self.state)
+            self._subscribers.add(updates)
+        try:
+            while (state := updates.get()) is not STOP:
+                file.write(encode(state))
+        finally:
+            with self._lock:
+                self._subscribers.discard(updates)
+
+    def publish(self, state):
+        """
+        Метод, обновляющий состояние и рассылающий его подписчикам, если оно изменилось
+        :param state: Состояние, пригодное для сериализации в JSON
+        :return: bool - изменилось ли состояние
+        """
+        with self._lock:
+            if state == self.state:
+                return False
+            self.state = state
+            for updates in self._subscribers:
+                self._replace(updates, state)
+        return True
+
+    @staticmethod
+    def _replace(updates, message):
+        """
+        Метод, заменяющий неотправленное сообщение подписчика новым
+        :param updates: Очередь подписчика размером 1
+        :param message: Новое сообщение
+        :return: None
+        """
+        try:
+            updates.get_nowait()
+        except Empty:
+            pass
+        updates.put_nowait(message)
+
+    def shutdown(self):
+        """
+        Метод, останавливающий сервер и завершающий подписки
+        :return: None
+        """
+        with self._lock:
+            for updates in self._subscribers:
+                self._replace(updates, STOP)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def query(command, port=STATE_PORT):
+    """
+    Функция-клиент, отправляющая команду серверу состояния
+    :param command: snapshot или subscribe
+    :param port: Порт сервера на localhost
+    :return: Генератор полученных сообщений
+    """
+    with socket.create_connection(("127.0.0.1", port)) as connection:
+        connection.sendall(command.encode("utf-8") + b"\n")
+        with connection.makefile(encoding="utf-8") as file:
+            for line in file:
+                yield json.loads(line)
+                if command != "subscribe":
+                    return
+
+
+if __name__ == "__main__":
+    for message in query(sys.argv[1] if len(sys.argv) > 1 else "snapshot",
+                         int(sys.argv[2]) if len(sys.argv) > 2 else STATE_PORT):
+        print(json.dumps(message, ensure_ascii=False), flush=True)
@@ -5,21 +5,25 @@
     - Оповещения об обновлении шахт
     - Настройки, возможность их изменять с помощью команд
 """
-from time import time as get_time
+from clock import get_time
 from time import sleep
-from datetime import time, datetime
-from pathlib import Path
-from os import path, listdir, system
-from sys import exit
+from datetime import datetime, timedelta, time
+from os import path, listdir
+from sys import exit, stdout
 import re
-import gzip
 import platform
-from win10toast import ToastNotifier
-from win11toast import toast
-import yaml
-import pytz
-
-LOG_PATH = path.join(Path.home(), "AppData", "Roaming", ".vimeworld", "minigames", "logs")
+from log_source import LogSource, LogChunk, LogError
+from kill_index import KillIndex
+from backfill import PARALLEL_MIN_BYTES, archive_lines, scan_archives
+from line_classifier import LineClassifier, BossKill, Command, TIME_LENGTH
+from settings_store import SettingsStore
+from notifier import NotificationDispatcher, FileBackend, console_backend
+from scheduler import Scheduler
+from boss_board import BoardView
+from metrics import METRICS, serve_metrics
+from queue import Queue, Empty
+
+LOG_PATH = path.join(path.expanduser("~"), "AppData", "Roaming", ".vimeworld", "minigames", "logs")
 OS = platform.system() + platform.release()
 RAINBOW_NAMES = {"Королевский зомби": "\033[37mКоролевский зомби\033[0m",
                  "Холуй": "\033[37mХолуй\033[0m",
@@ -34,107 +38,142 @@ RAINBOW_NAMES = {"Королевский зомби": "\033[37mКоролевс
                  "Житель края": "\033[35mЖитель края\033[0m",
                  "Небесный владыка": "\033[34mНебесный владыка\033[0m",
                  "Хранитель подводного мира": "\033[36mХранитель подводного мира\033[0m"}
+SERVICE_TIMES = (time(0, 56), time(6, 56), time(12, 56), time(18, 56))
+BOSS_REMINDER_PERIOD = 60
+METRICS_EXPORT_PERIOD = 10
+SOURCE_RETRY_PERIOD = 5
+STD_OUTPUT_HANDLE = -11
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+NOTIFIER = NotificationDispatcher()
 
 
-def processing_old_logs(boss_respawn, bosses_cooldown, notification_duration):
+def processing_old_logs(boss_respawn, bosses_cooldown, notification_duration, checkpoint,
+                        parallel=True, log_path=None, record_kill=None,
+                        min_bytes=PARALLEL_MIN_BYTES):
     """
-    Функция, обрабатывающая старые log-файлы для обновления информации о боссах
+    Функция, обрабатывающая ещё не обработанные старые log-файлы для обновления информации о боссах
     :param boss_respawn: Словарь, ключ - имя босса, значение - время его следующего респавна
     :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
     :param notification_duration: Длительность одного оповещения в секундах
+    :param checkpoint: Контрольная точка с уже обработанными архивами
+    :param parallel: Обрабатывать ли архивы параллельно в пуле процессов
+    :param log_path: Каталог логов, по умолчанию - LOG_PATH
+    :param record_kill: Функция, вызываемая с временем убийства и именем каждого убитого босса
+    :param min_bytes: Минимальный суммарный размер архивов для пула процессов (scan_archives)
     :return: None
     """
-    log_gz_names = (filename for filename in listdir(LOG_PATH) if validate_gz(filename))
-    for log_gz_name in log_gz_names:
-        with gzip.open(path.join(LOG_PATH, log_gz_name), "rt", encoding="utf-8") as file:
-            processing_log(file, boss_respawn, bosses_cooldown, notification_duration)
+    log_path = log_path or LOG_PATH
+    log_gz_names = sorted((filename for filename in listdir(log_path) if validate_gz(filename)),
+                          key=natural_sort_key)
+    checkpoint.retain_archives(log_gz_names)
+    pending = [name for name in log_gz_names
+               if not checkpoint.is_archive_processed(name, path.join(log_path, name))]
+    archives_respawn = {}
+    if parallel:
+        error_ico_path = path.join("icons", "error.ico")
+        for events in scan_archives([path.join(log_path, name) for name in pending],
+                                    min_bytes=min_bytes):
+            for kill_time, name in events:
+                if record_kill is not None:
+                    record_kill(kill_time, name)
+                processing_boss_kill(kill_time, name, archives_respawn, bosses_cooldown,
+                                     error_ico_path, notification_duration)
+    else:
+        classifier = LineClassifier()
+        for log_gz_name in pending:
+            processing_log(archive_lines(path.join(log_path, log_gz_name)), archives_respawn,
+                           bosses_cooldown, notification_duration, classifier,
+                           record_kill=record_kill)
+    for log_gz_name in pending:
+        checkpoint.mark_archive(log_gz_name, path.join(log_path, log_gz_name))
+    for boss, respawn_time in archives_respawn.items():
+        boss_respawn[boss] = max(respawn_time, boss_respawn.get(boss, respawn_time))
 
 
-def processing_log(file, boss_respawn, bosses_cooldown, notification_duration, nickname=""):
+def processing_log(file, boss_respawn, bosses_cooldown, notification_duration, classifier,
+                   settings=None, record_kill=None):
     """
     Функция, обрабатывающая log-файл и обновляет информацию о боссах и изменяет настройки
     :param file: Открытый файл логов
     :param boss_respawn: Словарь, ключ - имя босса, значение - время его следующего респавна
     :param notification_duration: Длительность одного оповещения в секундах
     :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
-    :param nickname: Никнейм аккаунта в запущенном лаунчере
+    :param classifier: Классификатор строк (LineClassifier) текущей сессии
+    :param settings: Хранилище настроек, изменяемое командами
+    :param record_kill: Функция, вызываемая с временем убийства и именем каждого убитого босса
     :return: bool - были ли изменены настройки
     """
     settings_changed = False
-    boss_pattern = re.compile(r"\[(\d\d:\d\d:\d\d)\] \[Client thread/INFO\]: "
-                              r"\[CHAT\] (Все )?([А-Яа-яЁё ]+) был[аи]? повержен[ыа]? за")
-    command_pattern = re.compile(fr"\[(\d\d:\d\d:\d\d)\] \[Client thread/INFO\]: "
-                                 fr"\[CHAT\] .*{nickname}.*[:>] ~([-a-z+ ]+)([)(А-Яа-яЁё, \d]+)")
     error_ico_path = path.join("icons", "error.ico")
     success_ico_path = path.join("icons", "success.ico")
-    for line in file:
-        if "был" in line and (match := boss_pattern.match(line)):
-            processing_line_with_boss(match, boss_respawn, bosses_cooldown, error_ico_path,
-                                      notification_duration)
-        if file.name.rsplit("\\", 1)[1] == "latest.log" and nickname in line and \
-                (match := command_pattern.match(line)):
-            command_time = time.fromisoformat(match.group(1))
-            command_time = datetime.combine(datetime.now().date(), command_time).timestamp()
-            command = match.group(2)[:-1]
-            params = match.group(3)
-            if datetime.now().timestamp() - command_time <= 120:
+    for line in METRICS.counted("lines_candidates", file):
+        match classifier.classify(line):
+            case None:
+                continue
+            case BossKill(kill_time, name):
+                METRICS.increment("events", label="boss_kill")
+                if record_kill is not None:
+                    record_kill(kill_time, name)
+                processing_boss_kill(kill_time, name, boss_respawn, bosses_cooldown,
+                                     error_ico_path, notification_duration)
+            case Command(command_time, command, params) if get_time() - command_time <= 120:
+                METRICS.increment("events", label="command")
                 match command:
                     case "d":
                         settings_changed = change_duration_notification(params, error_ico_path,
                                                                         success_ico_path,
-                                                                        notification_duration)
+                                                                        notification_duration,
+                                                                        settings)
                     case "b add":
                         settings_changed = add_boss(params, error_ico_path, success_ico_path,
-                                                    notification_duration)
+                                                    notification_duration, settings)
                     case "b skip":
                         settings_changed = skip_boss(params, error_ico_path, success_ico_path,
                                                      boss_respawn, notification_duration)
                     case "bl add":
                         settings_changed = add_to_blacklist(params, success_ico_path,
-                                                            notification_duration)
+                                                            notification_duration, settings)
                     case "bl remove":
                         settings_changed = remove_from_blacklist(params, success_ico_path,
-                                                                 notification_duration)
+                                                                 notification_duration, settings)
                     case "m":
                         settings_changed = set_timer_to_mine(params, error_ico_path,
                                                              success_ico_path,
-                                                             notification_duration)
+                                                             notification_duration, settings)
                     case _:
-                        show_toast(OS, "Ooops...", "Неправильная команда", error_ico_path,
-                                   notification_duration)
+                        NOTIFIER.submit("Ooops...", "Неправильная команда", error_ico_path,
+                                        notification_duration)
                         continue
     return settings_changed
 
 
-def launch_boss_notifications(boss_respawn, blacklist, notification_duration, colored,
-                              rainbow_names):
+def boss_board_lines(boss_respawn, colored, rainbow_names):
     """
-    Функция, создающая и запускающая всплывающие оповещения о боссах
-    :param boss_respawn: Словарь, ключ - имя босса, значение - время его следующего респавна
-    :param blacklist: Список боссов, о которых не будут присылаться оповещения
-    :param notification_duration: Длительность одного оповещения в секундах
+    Функция, формирующая строки табло с временем респавна боссов
+    :param boss_respawn: Время респавна боссов (BossRespawn), упорядоченное по времени
     :param colored: Булевое значение, нужно ли использовать цветные названия
     :param rainbow_names: Словарь, ключ - обычное название, значение - цветное название
-    :return: None
+    :return: Список строк
     """
-    for_print = []
+    lines = []
     for boss, respawn_time in boss_respawn.items():
-        for_print.append([boss, respawn_time])
-        if boss not in blacklist and get_time() >= respawn_time:
-            show_toast(OS, "Босс", boss, path.join("icons", f"{boss}.ico"),
-                       notification_duration)
-            sleep(0.1)
-    for_print.sort(key=lambda pair: pair[1])
-    for pair in for_print:
-        plural = pair[0] == "Всадники апокалипсиса"
-        if colored:
-            pair[0] = rainbow_names[pair[0]]
-        if plural:
-            print(pair[0], "заспавнятся примерно в",
-                  datetime.fromtimestamp(pair[1]).strftime("%H:%M:%S"))
-        else:
-            print(pair[0], "заспавнится примерно в",
-                  datetime.fromtimestamp(pair[1]).strftime("%H:%M:%S"))
+        verb = "заспавнятся" if boss == "Всадники апокалипсиса" else "заспавнится"
+        name = rainbow_names.get(boss, boss) if colored else boss
+        lines.append(f"{name} {verb} примерно в "
+                     f"{datetime.fromtimestamp(respawn_time).strftime('%H:%M:%S')}")
+    return lines
+
+
+def remind_about_boss(boss, notification_duration, account=None):
+    """
+    Функция, выводящая всплывающее оповещение о респавне босса
+    :param boss: Имя босса
+    :param notification_duration: Длительность уведомления
+    :param account: Никнейм аккаунта, указываемый в заголовке при нескольких аккаунтах
+    :return: None
+    """
+    title = f"Босс ({account})" if account else "Босс"
+    NOTIFIER.submit(title, boss, path.join("icons", f"{boss}.ico"), notification_duration)
 
 
 def validate_gz(filename):
@@ -144,81 +183,78 @@ def validate_gz(filename):
     :return: bool - удовлетворяет ли название требованиям
     """
     body, tail = path.splitext(filename)
-    if not body.startswith(datetime.now().strftime("%Y-%m-%d")):
+    if not body.startswith(datetime.fromtimestamp(get_time()).strftime("%Y-%m-%d")):
         return False
     if not tail == ".gz":
         return False
     return True
 
 
-def load_settings_variables():
+def natural_sort_key(filename):
     """
-    Функция, загружающая и возвращающая все переменные из файла с настройками
-    :return: Кортеж с переменными: словарь босс-кулдаун, чёрный список, длительность оповещения,
-    словарь шахта-кулдаун, булевое значение цветные ли названия, список шахт для оповещения
+    Функция, возвращающая ключ сортировки, при котором номера в названии сравниваются как числа
+    (2023-05-01-2.log.gz идёт раньше 2023-05-01-10.log.gz)
+    :param filename: Название файла
+    :return: Список частей названия
     """
-    with open("settings.yaml", encoding="windows-1251") as file:
-        settings = yaml.safe_load(file)
-    bosses_cooldown = settings["bosses_cooldown"]
-    bosses_cooldown = {name: cooldown * 60 for name, cooldown in bosses_cooldown.items()}
-    if "blacklist" in settings:
-        blacklist = settings["blacklist"]
-    else:
-        blacklist = []
-    notification_duration = settings["notification_duration"]
-    mines_cooldown = settings["mines_cooldown"]
-    colored = settings["colored"]
-    if "mines_notifications" in settings:
-        mines_notifications = settings["mines_notifications"]
-        return bosses_cooldown, blacklist, notification_duration, mines_cooldown, \
-               colored, mines_notifications
-    return bosses_cooldown, blacklist, notification_duration, mines_cooldown, colored
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", filename)]
 
 
-def change_duration_notification(params, error_ico_path, success_ico_path, notification_duration):
+def load_settings_variables(settings, kill_index=None):
+    """
+    Функция, возвращающая все переменные из хранилища настроек
+    :param settings: Хранилище настроек (SettingsStore)
+    :param kill_index: Индекс убийств (KillIndex), по которому оцениваются кулдауны боссов,
+    если это включено в настройках
+    :return: Кортеж с переменными: словарь босс-кулдаун, длительность оповещения,
+    словарь шахта-кулдаун, список шахт для оповещения
+    """
+    bosses_cooldown = settings.bosses_cooldown
+    if kill_index is not None and settings.learned_cooldowns:
+        bosses_cooldown.update(kill_index.learned_cooldowns(bosses_cooldown))
+    return bosses_cooldown, settings.notification_duration, settings.mines_cooldown, \
+        settings.mines_notifications
+
+
+def change_duration_notification(params, error_ico_path, success_ico_path, notification_duration,
+                                 settings):
     """
     Функция, обрабатывающая команду ~d. Изменяет длительность оповещения
     :param params: Полученные от пользователя параметры команды
     :param error_ico_path: Путь к иконке ошибки
     :param success_ico_path: Путь к иконке успеха
     :param notification_duration: Длительность одного оповещения в секундах
+    :param settings: Хранилище настроек
     :return: bool - изменены ли параметры
     """
     if not params.isdigit():
-        show_toast(OS, "Ooops...", "Длительность оповещения должна быть цифрой (количество секунд)",
-                   error_ico_path, notification_duration)
+        NOTIFIER.submit("Ooops...",
+                        "Длительность оповещения должна быть цифрой (количество секунд)",
+                        error_ico_path, notification_duration)
         return False
-    params = int(params)
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    settings["notification_duration"] = params
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    show_toast(OS, "Успешно!", "Длительность оповещения изменена", success_ico_path,
-               notification_duration)
+    settings.set_notification_duration(int(params))
+    NOTIFIER.submit("Успешно!", "Длительность оповещения изменена", success_ico_path,
+                    notification_duration)
     return True
 
 
-def add_boss(params, error_ico_path, success_ico_path, notification_duration):
+def add_boss(params, error_ico_path, success_ico_path, notification_duration, settings):
     """
     Функция, обрабатывающая команду ~b add. Добавляет нового босса
     :param params: Полученные от пользователя параметры команды
     :param error_ico_path: Путь к иконке ошибки
     :param success_ico_path: Путь к иконке успеха
     :param notification_duration: Длительность одного оповещения в секундах
+    :param settings: Хранилище настроек
     :return: bool - изменены ли параметры
     """
     params = params.rsplit(" ", 1)
     if not params[1].isdigit():
-        show_toast(OS, "Ooops...", "Кулдаун респавна босса должен быть цифрой (количество минут)",
-                   error_ico_path, notification_duration)
+        NOTIFIER.submit("Ooops...", "Кулдаун респавна босса должен быть цифрой (количество минут)",
+                        error_ico_path, notification_duration)
         return False
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    settings["bosses_cooldown"][params[0]] = int(params[1])
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    show_toast(OS, "Успешно!", "Босс добавлен", success_ico_path, notification_duration)
+    settings.add_boss(params[0], int(params[1]))
+    NOTIFIER.submit("Успешно!", "Босс добавлен", success_ico_path, notification_duration)
     return True
 
 
@@ -235,73 +271,60 @@ def skip_boss(params, error_ico_path, success_ico_path, boss_respawn, notificati
     one_boss = [params] == (params := [boss.strip() for boss in params.split(",")])
     for boss in params:
         if boss not in boss_respawn:
-            show_toast(OS, "Ooops...", "Указано некорректное имя босса", error_ico_path,
-                       notification_duration)
+            NOTIFIER.submit("Ooops...", "Указано некорректное имя босса", error_ico_path,
+                            notification_duration)
             return False
         del boss_respawn[boss]
     if one_boss:
-        show_toast(OS, "Успешно!", "Босс пропущен", success_ico_path, notification_duration)
+        NOTIFIER.submit("Успешно!", "Босс пропущен", success_ico_path, notification_duration)
     else:
-        show_toast(OS, "Успешно!", "Боссы пропущены", success_ico_path, notification_duration)
+        NOTIFIER.submit("Успешно!", "Боссы пропущены", success_ico_path, notification_duration)
     return False
 
 
-def add_to_blacklist(params, success_ico_path, notification_duration):
+def add_to_blacklist(params, success_ico_path, notification_duration, settings):
     """
     Функция, обрабатывающая команду ~bl add. Добавляет боссов в чёрный список
     :param params: Полученные от пользователя параметры команды
     :param success_ico_path: Путь к иконке успеха
     :param notification_duration: Длительность одного оповещения в секундах
+    :param settings: Хранилище настроек
     :return: True - параметры изменены
     """
-    params = [boss.strip() for boss in params.split(",")]
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    if "blacklist" not in settings:
-        settings["blacklist"] = params
-    else:
-        settings["blacklist"] += params
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    show_toast(OS, "Успешно!", "Чёрный список обновлён", success_ico_path, notification_duration)
+    settings.add_to_blacklist([boss.strip() for boss in params.split(",")])
+    NOTIFIER.submit("Успешно!", "Чёрный список обновлён", success_ico_path, notification_duration)
     return True
 
 
-def remove_from_blacklist(params, success_ico_path, notification_duration):
+def remove_from_blacklist(params, success_ico_path, notification_duration, settings):
     """
     Функция, обрабатывающая команду ~bl remove. Удаляет боссов из чёрного списка
     :param params: Полученные от пользователя параметры команды
     :param success_ico_path: Путь к иконке успеха
     :param notification_duration: Длительность одного оповещения в секундах
+    :param settings: Хранилище настроек
     :return: True - параметры изменены
     """
-    params = [boss.strip() for boss in params.split(",")]
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    settings["blacklist"] = [name for name in settings["blacklist"] if name not in params]
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    show_toast(OS, "Успешно!", "Чёрный список обновлён", success_ico_path, notification_duration)
+    settings.remove_from_blacklist([boss.strip() for boss in params.split(",")])
+    NOTIFIER.submit("Успешно!", "Чёрный список обновлён", success_ico_path, notification_duration)
     return True
 
 
-def processing_line_with_boss(match, boss_respawn, bosses_cooldown, error_ico_path,
-                              notification_duration):
+def processing_boss_kill(kill_time, name, boss_respawn, bosses_cooldown, error_ico_path,
+                         notification_duration):
     """
-    Функция, обрабатывающая строку с информацией об убийстве босса
-    :param match: Найденное совпадение в строке с регулярным выражением
+    Функция, обновляющая время респавна убитого босса
+    :param kill_time: Время убийства босса (timestamp)
+    :param name: Имя босса
     :param boss_respawn: Словарь, ключ - имя босса, значение - время его следующего респавна
     :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
     :param error_ico_path: Путь к иконке ошибки
     :param notification_duration: Длительность одного оповещения в секундах
     :return: None
     """
-    kill_time = time.fromisoformat(match.group(1))
-    kill_time = datetime.combine(datetime.now().date(), kill_time).timestamp()
-    name = match.group(3)
     if name not in bosses_cooldown:
-        show_toast(OS, "Ooops...", f"Босса '{name}' нет в списке. Добавьте его", error_ico_path,
-                   notification_duration)
+        NOTIFIER.submit("Ooops...", f"Босса '{name}' нет в списке. Добавьте его", error_ico_path,
+                        notification_duration)
     else:
         boss_respawn[name] = kill_time + bosses_cooldown[name]
 
@@ -318,8 +341,10 @@ def show_toast(os, title="", message="", icon="", duration=3):
     """
     match os:
         case "Windows10":
+            from win10toast import ToastNotifier
             ToastNotifier().show_toast(title, message, icon, duration)
         case "Windows11":
+            from win11toast import toast
             icon = {
                 "src": icon,
                 "placement": "appLogoOverride"
@@ -331,102 +356,481 @@ def show_toast(os, title="", message="", icon="", duration=3):
             exit()
 
 
+def enable_ansi_colors():
+    """
+    Функция, включающая в консоли Windows обработку ANSI-последовательностей (цвета и управление
+    курсором). Остальные терминалы поддерживают их по умолчанию
+    :return: bool - включена ли обработка
+    """
+    if platform.system() != "Windows":
+        return True
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
+    mode = ctypes.c_uint32()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return False
+    return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+
+
+def create_notification_backend(name):
+    """
+    Функция, выбирающая способ показа оповещений
+    :param name: Название способа из настроек: auto (по операционной системе), console или file
+    :return: Функция, показывающая одно оповещение
+    """
+    if name == "console":
+        return console_backend
+    if name == "file":
+        return FileBackend()
+    if OS not in {"Windows10", "Windows11"}:
+        print("Извините, ваша операционная система не поддерживается")
+        sleep(3)
+        exit()
+    return lambda notification: show_toast(OS, notification.title, notification.message,
+                                           notification.icon, notification.duration)
+
+
 def remind_about_service(notification_duration):
     """
     Функция, выводящая всплывающие уведомления о службах в церкви
     :param notification_duration: Длительность уведомления
     :return: None
     """
-    if datetime.now(pytz.timezone("Europe/Moscow")).strftime("%H:%M:%S") in {"06:56:00",
-                                                                             "12:56:00",
-                                                                             "18:56:00",
-                                                                             "00:56:00"}:
-        show_toast(OS, "Служба", "Открылась запись на служение!",
-                   path.join("icons", "Служба.ico"), notification_duration)
+    NOTIFIER.submit("Служба", "Открылась запись на служение!",
+                    path.join("icons", "Служба.ico"), notification_duration)
 
 
-def remind_about_mine(cooldown, stopwatch, name, notification_duration):
+def remind_about_mine(name, notification_duration):
     """
-    Функция, оповещающая об обновлении шахты за 3 секунды до этого
-    :param cooldown: Кулдаун шахты в секундах
-    :param stopwatch: Секундомер, считающий до кулдауна
+    Функция, оповещающая об обновлении шахты
     :param name: Название шахты
     :param notification_duration: Длительность уведомления
-    :return: Количество секунд на секундомере
+    :return: None
     """
-    if stopwatch == (cooldown - 3):
-        show_toast(OS, "Шахта", f'Шахта "{name}" обновилась',
-                   path.join("icons", f"{name}.ico"), notification_duration)
-        return stopwatch + 1
-    if stopwatch == cooldown:
-        return 0
-    return stopwatch + 1
+    NOTIFIER.submit("Шахта", f'Шахта "{name}" обновилась',
+                    path.join("icons", f"{name}.ico"), notification_duration)
 
 
-def set_timer_to_mine(params, error_ico_path, success_ico_path, notification_duration):
+def next_service_time(now):
+    """
+    Функция, вычисляющая время ближайшей службы в церкви (время московское)
+    :param now: Текущее время (timestamp)
+    :return: timestamp открытия записи на ближайшую службу
+    """
+    import pytz
+    moscow = pytz.timezone("Europe/Moscow")
+    today = datetime.fromtimestamp(now, moscow).date()
+    for day in (today, today + timedelta(days=1)):
+        for service_time in SERVICE_TIMES:
+            deadline = moscow.localize(datetime.combine(day, service_time)).timestamp()
+            if deadline > now:
+                return deadline
+
+
+def next_period_deadline(deadline, period):
+    """
+    Функция, вычисляющая следующее срабатывание периодического события от предыдущего срабатывания,
+    а не от текущего времени, поэтому опоздания не накапливаются. Пропущенные периоды пропускаются
+    :param deadline: Предыдущее время срабатывания (timestamp)
+    :param period: Период в секундах
+    :return: timestamp
+    """
+    deadline += period
+    if (now := get_time()) >= deadline:
+        deadline += ((now - deadline) // period + 1) * period
+    return deadline
+
+
+def schedule_service_reminder(scheduler, settings):
+    """
+    Функция, планирующая напоминание о ближайшей службе в церкви
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :return: None
+    """
+    def remind(deadline):
+        METRICS.observe("reminder_jitter_seconds", get_time() - deadline, "service")
+        remind_about_service(settings.notification_duration)
+        schedule_service_reminder(scheduler, settings)
+
+    scheduler.schedule("service", next_service_time(get_time()), remind)
+
+
+def schedule_metrics_export(scheduler, deadline):
+    """
+    Функция, планирующая периодическую запись метрик в файл
+    :param scheduler: Планировщик
+    :param deadline: Время ближайшей записи (timestamp)
+    :return: None
+    """
+    def export(deadline):
+        METRICS.write()
+        schedule_metrics_export(scheduler, next_period_deadline(deadline, METRICS_EXPORT_PERIOD))
+
+    scheduler.schedule("metrics", deadline, export)
+
+
+def observe_line_lag(classifier, line):
+    """
+    Функция, добавляющая в метрики задержку обработки строки относительно её времени записи
+    :param classifier: Классификатор строк
+    :param line: Последняя обработанная строка
+    :return: None
+    """
+    if METRICS.enabled and len(line) >= TIME_LENGTH and \
+            (timestamp := classifier.timestamp(line)) is not None:
+        METRICS.observe("line_lag_seconds", get_time() - timestamp)
+
+
+def schedule_mine_reminder(scheduler, settings, name, deadline):
+    """
+    Функция, планирующая оповещения об обновлении шахты каждый её кулдаун
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param name: Название шахты
+    :param deadline: Время первого оповещения (timestamp)
+    :return: None
+    """
+    def remind(deadline):
+        METRICS.observe("reminder_jitter_seconds", get_time() - deadline, "mine")
+        remind_about_mine(name, settings.notification_duration)
+        period = max(settings.mines_cooldown[name], 1)
+        schedule_mine_reminder(scheduler, settings, name, next_period_deadline(deadline, period))
+
+    scheduler.schedule(("mine", name), deadline, remind)
+
+
+def schedule_mine_reminders(scheduler, settings, mines_notifications, mines_cooldown):
+    """
+    Функция, приводящая запланированные оповещения о шахтах в соответствие со списком шахт.
+    Шахта добавляется командой в секунду обновления, оповещение приходит за 3 секунды до следующего
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param mines_notifications: Список шахт для оповещения
+    :param mines_cooldown: Словарь, ключ - название шахты, значение - её кулдаун в секундах
+    :return: None
+    """
+    for mine in mines_cooldown:
+        if mine in mines_notifications and ("mine", mine) not in scheduler:
+            schedule_mine_reminder(scheduler, settings, mine, get_time() + mines_cooldown[mine] - 3)
+        elif mine not in mines_notifications:
+            scheduler.cancel(("mine", mine))
+
+
+def schedule_boss_reminder(scheduler, settings, boss, deadline, account=None):
+    """
+    Функция, планирующая оповещение о респавне босса, повторяющееся, пока босса не убьют
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param boss: Имя босса
+    :param deadline: Время респавна босса (timestamp)
+    :param account: Никнейм аккаунта, указываемый в оповещении при нескольких аккаунтах
+    :return: None
+    """
+    def remind(deadline):
+        if boss not in settings.blacklist:
+            remind_about_boss(boss, settings.notification_duration, account)
+        schedule_boss_reminder(scheduler, settings, boss,
+                               next_period_deadline(deadline, BOSS_REMINDER_PERIOD), account)
+
+    scheduler.schedule(("boss", account, boss), deadline, remind)
+
+
+def schedule_boss_reminders(scheduler, settings, boss_respawn, scheduled_respawn, account=None):
+    """
+    Функция, перепланирующая оповещения о боссах, время респавна которых изменилось
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param boss_respawn: Словарь, ключ - имя босса, значение - время его следующего респавна
+    :param scheduled_respawn: Словарь с временем респавна, на которое запланированы оповещения
+    :param account: Никнейм аккаунта, указываемый в оповещениях при нескольких аккаунтах
+    :return: None
+    """
+    for boss, respawn_time in boss_respawn.items():
+        if scheduled_respawn.get(boss) != respawn_time:
+            scheduled_respawn[boss] = respawn_time
+            schedule_boss_reminder(scheduler, settings, boss, respawn_time, account)
+    for boss in scheduled_respawn.keys() - boss_respawn.keys():
+        scheduler.cancel(("boss", account, boss))
+        del scheduled_respawn[boss]
+
+
+def show_boss_board(view, sources, colored):
+    """
+    Функция, обновляющая табло с временем респавна боссов, если оно изменилось
+    :param view: Консольное табло (BoardView)
+    :param sources: Список отслеживаемых источников логов (LogSource)
+    :param colored: Булевое значение, нужно ли использовать цветные названия
+    :return: None
+    """
+    revision = (colored, *((source.nickname, source.boss_respawn.revision) for source in sources))
+    if revision == view.revision:
+        return
+    lines = []
+    for source in sources:
+        if len(sources) > 1:
+            lines.append(f"[{source.nickname}]")
+        lines.extend(boss_board_lines(source.boss_respawn, colored, RAINBOW_NAMES))
+    view.render(lines, revision)
+
+
+def collect_state(sources, scheduler):
+    """
+    Функция, собирающая состояние для клиентов API: время респавна боссов каждого аккаунта,
+    время оповещений о шахтах и все запланированные оповещения в порядке срабатывания
+    :param sources: Список отслеживаемых источников логов (LogSource)
+    :param scheduler: Планировщик
+    :return: Словарь, пригодный для сериализации в JSON, время - timestamp
+    """
+    upcoming = []
+    for deadline, key in scheduler.pending():
+        match key:
+            case ("boss", account, boss):
+                upcoming.append({"time": deadline, "kind": "boss", "name": boss,
+                                 "account": account})
+            case ("mine", mine):
+                upcoming.append({"time": deadline, "kind": "mine", "name": mine})
+            case "service":
+                upcoming.append({"time": deadline, "kind": "service"})
+    return {"accounts": [{"nickname": source.nickname, "log_path": source.log_path,
+                          "boss_respawn": dict(source.boss_respawn)} for source in sources],
+            "mines": {event["name"]: event["time"] for event in upcoming
+                      if event["kind"] == "mine"},
+            "upcoming": upcoming}
+
+
+def report_source_error(source, error, notification_duration):
+    """
+    Функция, оповещающая об ошибке чтения логов одного источника
+    :param source: Источник логов (LogSource)
+    :param error: Ошибка (OSError)
+    :param notification_duration: Длительность одного оповещения в секундах
+    :return: None
+    """
+    NOTIFIER.submit("Ooops...", f"Не удалось прочитать логи {source.nickname or source.log_path}: "
+                                f"{error.strerror or error}",
+                    path.join("icons", "error.ico"), notification_duration)
+
+
+def reload_settings(settings, notification_duration):
+    """
+    Функция, перечитывающая изменённый извне файл настроек. Об ошибке в файле оповещает один
+    раз, прежние настройки остаются в силе
+    :param settings: Хранилище настроек
+    :param notification_duration: Длительность одного оповещения в секундах
+    :return: bool - были ли настройки перечитаны
+    """
+    try:
+        return settings.reload_if_changed()
+    except (OSError, ValueError) as error:
+        NOTIFIER.submit("Ooops...", f"Настройки не перечитаны: "
+                                    f"{getattr(error, 'strerror', None) or error}",
+                        path.join("icons", "error.ico"), notification_duration)
+        return False
+
+
+def start_source(source, events, bosses_cooldown, notification_duration, report=True,
+                 follow=True):
+    """
+    Функция, запускающая отслеживание источника логов: обработка архивов, открытие latest.log,
+    восстановление времени респавна и запуск потока чтения
+    :param source: Источник логов (LogSource)
+    :param events: Очередь объектов LogChunk и LogError
+    :param bosses_cooldown: Словарь, ключ - имя босса, значение - его кулдаун
+    :param notification_duration: Длительность одного оповещения в секундах
+    :param report: Оповещать ли об ошибке (например, если каталога или latest.log ещё нет)
+    :param follow: Запускать ли поток чтения (см. LogSource.start)
+    :return: bool - запущен ли источник
+    """
+    try:
+        with METRICS.timer("processing_old_logs_seconds"):
+            processing_old_logs(source.boss_respawn, bosses_cooldown, notification_duration,
+                                source.checkpoint, log_path=source.log_path,
+                                record_kill=source.record_kill)
+        source.open_latest(bosses_cooldown, get_time())
+        source.restore_respawn(bosses_cooldown, get_time())
+    except OSError as error:
+        if report:
+            report_source_error(source, error, notification_duration)
+        return False
+    source.start(events, follow)
+    return True
+
+
+def schedule_source_start(scheduler, pending, sources, events, variables, deadline):
+    """
+    Функция, планирующая повторные попытки запустить источники, которые не удалось запустить
+    при старте приложения. Запущенный источник переносится из pending в sources
+    :param scheduler: Планировщик
+    :param pending: Список ещё не запущенных источников (LogSource)
+    :param sources: Список запущенных источников (LogSource)
+    :param events: Очередь объектов LogChunk и LogError
+    :param variables: Функция, возвращающая текущий кортеж переменных настроек главного цикла
+    :param deadline: Время следующей попытки (timestamp)
+    :return: None
+    """
+    def retry(deadline):
+        bosses_cooldown, notification_duration, _, _ = variables()
+        for source in list(pending):
+            if start_source(source, events, bosses_cooldown, notification_duration, False):
+                pending.remove(source)
+                sources.append(source)
+        if pending:
+            schedule_source_start(scheduler, pending, sources, events, variables,
+                                  next_period_deadline(deadline, SOURCE_RETRY_PERIOD))
+
+    scheduler.schedule("sources", deadline, retry)
+
+
+def collect_chunks(events, timeout):
+    """
+    Функция, ожидающая новые строки логов от источников и забирающая все накопившиеся порции
+    :param events: Очередь объектов LogChunk и LogError
+    :param timeout: Максимальное время ожидания в секундах
+    :return: Список объектов LogChunk и LogError
+    """
+    try:
+        chunks = [events.get(timeout=max(timeout, 0))]
+    except Empty:
+        return []
+    while not events.empty():
+        chunks.append(events.get_nowait())
+    return chunks
+
+
+def set_timer_to_mine(params, error_ico_path, success_ico_path, notification_duration, settings):
     """
     Функция, обрабатывающая команду ~m. Добавляет шахту в список для оповещения
     :param params: Полученные от пользователя параметры команды
     :param error_ico_path: Путь к иконке ошибки
     :param success_ico_path: Путь к иконке успеха
     :param notification_duration: Длительность одного оповещения в секундах
+    :param settings: Хранилище настроек
     :return: bool - изменены ли параметры
     """
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    if params not in settings["mines_cooldown"]:
-        show_toast(OS, "Ooops...", "Неправильное название шахты", error_ico_path,
-                   notification_duration)
+    if params not in settings.mines_cooldown:
+        NOTIFIER.submit("Ooops...", "Неправильное название шахты", error_ico_path,
+                        notification_duration)
         return False
-    if "mines_notifications" not in settings:
-        settings["mines_notifications"] = [params]
-    else:
-        settings["mines_notifications"] += [params]
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    show_toast(OS, "Успешно!", "Шахта добавлена", success_ico_path, notification_duration)
+    settings.add_mine_notification(params)
+    NOTIFIER.submit("Успешно!", "Шахта добавлена", success_ico_path, notification_duration)
     return True
 
 
+def run_iteration(scheduler, settings, kill_index, sources, events, variables, timeout=None,
+                  view=None, state_server=None, save_checkpoints=True):
+    """
+    Функция, выполняющая одну итерацию главного цикла: планирование и выполнение напоминаний,
+    обновление табло и состояния API, ожидание и обработка новых строк логов, сохранение
+    и перечитывание настроек. Используется главной функцией и воспроизведением логов
+    :param scheduler: Планировщик
+    :param settings: Хранилище настроек
+    :param kill_index: Индекс убийств (KillIndex)
+    :param sources: Список запущенных источников логов (LogSource)
+    :param events: Очередь объектов LogChunk и LogError
+    :param variables: Кортеж переменных настроек (load_settings_variables)
+    :param timeout: Максимальное время ожидания новых строк в секундах, None - до ближайшего
+    запланированного события
+    :param view: Консольное табло (BoardView), None - табло не показывается
+    :param state_server: Сервер состояния (StateServer) или None
+    :param save_checkpoints: Планировать ли сохранение контрольных точек после новых строк,
+    False - контрольные точки сохраняет вызывающий код
+    :return: Кортеж переменных настроек, перечитанный, если настройки изменились
+    """
+    bosses_cooldown, notification_duration, mines_cooldown, mines_notifications = variables
+    schedule_mine_reminders(scheduler, settings, mines_notifications, mines_cooldown)
+    for source in sources:
+        schedule_boss_reminders(scheduler, settings, source.boss_respawn, source.scheduled_respawn,
+                                source.nickname if len(sources) > 1 else None)
+    scheduler.run_due(get_time())
+    if view is not None and settings.api != "daemon":
+        show_boss_board(view, sources, settings.colored)
+    if state_server is not None:
+        state_server.publish(collect_state(sources, scheduler))
+    if timeout is None:
+        timeout = scheduler.next_deadline() - get_time()
+    for chunk in collect_chunks(events, timeout):
+        match chunk:
+            case LogError(source, error):
+                report_source_error(source, error, notification_duration)
+                continue
+            case LogChunk(source, lines):
+                source.accept(chunk)
+        with METRICS.timer("processing_log_seconds"):
+            processing_log(lines, source.boss_respawn, bosses_cooldown, notification_duration,
+                           source.classifier, settings, source.record_kill)
+        if lines:
+            observe_line_lag(source.classifier, lines[-1])
+        if save_checkpoints and ("checkpoint", source.log_path) not in scheduler:
+            scheduler.schedule(("checkpoint", source.log_path), get_time() + 1,
+                               lambda _, source=source: source.save_checkpoint())
+    if settings.flush() or reload_settings(settings, notification_duration):
+        return load_settings_variables(settings, kill_index)
+    return variables
+
+
 def main():
     """
     Главная функция, связывающая весь функционал реализованных функций
     :return: None
     """
-    system("color")
-    with open("settings.yaml", encoding="windows-1251") as config:
-        settings = yaml.safe_load(config)
-    if "mines_notifications" in settings:
-        del settings["mines_notifications"]
-    with open("settings.yaml", "w", encoding="windows-1251") as config:
-        yaml.safe_dump(settings, config, indent=4, allow_unicode=True, sort_keys=False)
-    boss_respawn = {}
-    boss_notifications = 59
-    bosses_cooldown, blacklist, notification_duration, \
-    mines_cooldown, colored, *mines_notifications = load_settings_variables()
-    mines_stopwatches = {mine: 0 for mine in mines_cooldown}
-    processing_old_logs(boss_respawn, bosses_cooldown, notification_duration)
-    with open(path.join(LOG_PATH, "latest.log"), encoding='utf-8') as file:
-        line = file.readline()
-        nickname = line[line.find("Setting user: ") + 14:].rstrip()
+    enable_ansi_colors()
+    settings = SettingsStore.open()
+    settings.clear_mine_notifications()
+    settings.flush()
+    NOTIFIER.configure(create_notification_backend(settings.notification_backend),
+                       settings.notification_interval, settings.notification_coalesce)
+    NOTIFIER.start()
+    kill_index = KillIndex.open()
+    variables = load_settings_variables(settings, kill_index)
+    bosses_cooldown, notification_duration, _, _ = variables
+    events = Queue()
+    if settings.metrics != "off":
+        METRICS.enable()
+    sources, pending = [], []
+    for log_path in settings.log_paths or [LOG_PATH]:
+        source = LogSource(log_path, kill_index)
+        if start_source(source, events, bosses_cooldown, notification_duration):
+            sources.append(source)
+        else:
+            pending.append(source)
+    scheduler = Scheduler()
+    if pending:
+        schedule_source_start(scheduler, pending, sources, events, lambda: variables,
+                              get_time() + SOURCE_RETRY_PERIOD)
+    schedule_service_reminder(scheduler, settings)
+    metrics_server = None
+    match settings.metrics:
+        case "file":
+            schedule_metrics_export(scheduler, get_time())
+        case "http":
+            metrics_server = serve_metrics(METRICS, settings.metrics_port)
+    state_server = None
+    if settings.api != "off":
+        from state_server import StateServer
+        state_server = StateServer(settings.api_port)
+        state_server.publish(collect_state(sources, scheduler))
+        state_server.start()
+    view = BoardView(live=stdout.isatty() and settings.notification_backend != "console")
+    try:
         while True:
-            boss_notifications += 1
-            remind_about_service(notification_duration)
-            if processing_log(file, boss_respawn, bosses_cooldown, notification_duration, nickname):
-                bosses_cooldown, blacklist, notification_duration, \
-                mines_cooldown, colored, *mines_notifications = load_settings_variables()
-            if mines_notifications:
-                for mine in mines_notifications[0]:
-                    mines_stopwatches[mine] = remind_about_mine(mines_cooldown[mine],
-                                                                mines_stopwatches[mine],
-                                                                mine, notification_duration)
-            if boss_notifications == 60:
-                print("-" * 57)
-                launch_boss_notifications(boss_respawn, blacklist, notification_duration,
-                                          colored, RAINBOW_NAMES)
-                boss_notifications = 0
-            sleep(1)
+            variables = run_iteration(scheduler, settings, kill_index, sources, events, variables,
+                                      view=view, state_server=state_server)
+    finally:
+        for source in sources:
+            source.save_checkpoint()
+        kill_index.close()
+        NOTIFIER.stop(timeout=settings.notification_duration)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if state_server is not None:
+            state_server.shutdown()
+        if settings.metrics == "file":
+            METRICS.write()
 
 
 if __name__ == "__main__":
+    from multiprocessing import freeze_support
+    freeze_support()
     main()
@@ -0,0 +1,21 @@
+"""
+Общие настройки тестов: модули приложения импортируются из папки src, как при запуске из неё
+"""
+from os import path
+import sys
+import pytest
+
+sys.path.insert(0, path.join(path.dirname(path.dirname(path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def clock():
+    """
+    Виртуальные часы, установленные для всего приложения на время теста
+    :return: VirtualClock
+    """
+    from clock import VirtualClock, set_clock
+    clock = VirtualClock(0)
+    previous_clock = set_clock(clock)
+    yield clock
+    set_clock(previous_clock)
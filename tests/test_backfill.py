@@ -0,0 +1,92 @@
+"""
+Тесты просмотра уже записанных log-файлов: архивы .gz и latest.log с конца
+"""
+from datetime import datetime
+import gzip
+from backfill import BLOCK_SIZE, archive_lines, scan_archive, scan_archives, scan_latest_reverse
+from line_classifier import BossKill
+
+BOSSES = ("Йети", "Холуй", "Фенрир", "Матка")
+
+
+def write_archive(file_path, lines, seed):
+    """
+    Функция, записывающая архив, в котором каждая седьмая строка - убийство босса
+    :param file_path: Путь к архиву
+    :param lines: Количество строк
+    :param seed: Смещение, от которого зависят имена боссов и время строк
+    :return: None
+    """
+    with gzip.open(file_path, "wt", encoding="utf-8", newline="\r\n") as file:
+        for number in range(lines):
+            seconds = (seed * 1000 + number) % 86400
+            timestamp = f"[{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}]"
+            if number % 7 == 0:
+                boss = BOSSES[(number + seed) % len(BOSSES)]
+                verb = "была повержена" if boss == "Матка" else "был повержен"
+                file.write(f"{timestamp} [Client thread/INFO]: [CHAT] {boss} {verb} за 1 мин.\n")
+            else:
+                file.write(f"{timestamp} [Client thread/INFO]: [CHAT] [Prison] Steve > привет\n")
+
+
+def test_parallel_scan_matches_sequential(tmp_path):
+    file_paths = [str(tmp_path / f"2026-01-02-{number}.log.gz") for number in range(1, 4)]
+    for seed, file_path in enumerate(file_paths):
+        write_archive(file_path, 3000, seed)
+    expected = [scan_archive(file_path) for file_path in file_paths]
+    assert sum(map(len, expected)) == 3 * 429
+    assert scan_archives(file_paths, workers=2, min_bytes=0) == expected
+
+
+def test_scan_archive_reads_lines_across_blocks(tmp_path):
+    file_path = str(tmp_path / "2026-01-02-1.log.gz")
+    lines = BLOCK_SIZE // 50 * 3
+    write_archive(file_path, lines, 0)
+    assert len(scan_archive(file_path)) == (lines + 6) // 7
+
+
+def kill_line(seconds, boss):
+    """
+    Функция, формирующая строку latest.log об убийстве босса
+    :param seconds: Время строки в секундах от начала суток
+    :param boss: Имя босса
+    :return: bytes
+    """
+    timestamp = f"[{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}]"
+    return f"{timestamp} [Client thread/INFO]: [CHAT] {boss} был повержен за 1 мин.\r\n" \
+        .encode("utf-8")
+
+
+def test_archive_kill_line_split_across_blocks(tmp_path):
+    file_path = str(tmp_path / "2026-01-02-1.log.gz")
+    line = kill_line(60, "Йети")
+    padding = BLOCK_SIZE - line.index("был".encode("utf-8")) - 3
+    with gzip.open(file_path, "wb") as file:
+        file.write(b"a" * (padding - 2) + b"\r\n" + line + kill_line(120, "Холуй").rstrip())
+    assert list(archive_lines(file_path)) == [line.rstrip().decode("utf-8"),
+                                              kill_line(120, "Холуй").rstrip().decode("utf-8")]
+
+
+def test_reverse_scan_finds_latest_kill_of_each_boss(tmp_path, clock):
+    day = datetime(2026, 1, 2).timestamp()
+    clock.advance_to(day + 7200)
+    file_path = tmp_path / "latest.log"
+    lines = [kill_line(600, "Йети"), kill_line(1200, "Холуй"), kill_line(1800, "Йети"),
+             b"[00:40:00] [Client thread/INFO]: [CHAT] [Prison] Steve > \xd0\xbf\xd0\xb8\r\n"]
+    file_path.write_bytes(b"".join(lines) + b"[00:41:00] unfinished")
+    events, offset = scan_latest_reverse(str(file_path), {"Йети", "Холуй"}, day)
+    assert events == [BossKill(day + 1800, "Йети"), BossKill(day + 1200, "Холуй")]
+    assert offset == len(b"".join(lines))
+
+
+def test_reverse_scan_stops_at_horizon(tmp_path, clock):
+    """
+    Убийство Холуя записано раньше строки старше горизонта и не должно быть найдено
+    """
+    day = datetime(2026, 1, 2).timestamp()
+    clock.advance_to(day + 7200)
+    file_path = tmp_path / "latest.log"
+    file_path.write_bytes(kill_line(5000, "Холуй") + kill_line(1200, "Фенрир") +
+                          kill_line(3600, "Йети"))
+    events, _ = scan_latest_reverse(str(file_path), {"Йети", "Холуй", "Фенрир"}, day + 1800)
+    assert events == [BossKill(day + 3600, "Йети")]
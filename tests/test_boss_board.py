@@ -0,0 +1,58 @@
+"""
+Тесты упорядоченного времени респавна и перерисовки консольного табло
+"""
+from io import StringIO
+from boss_board import BoardView, BossRespawn
+
+
+def test_respawn_iterates_in_respawn_order():
+    boss_respawn = BossRespawn({"Йети": 300, "Холуй": 100, "Матка": 200})
+    assert list(boss_respawn) == ["Холуй", "Матка", "Йети"]
+    boss_respawn["Холуй"] = 400
+    assert list(boss_respawn.items()) == [("Матка", 200), ("Йети", 300), ("Холуй", 400)]
+    del boss_respawn["Йети"]
+    assert list(boss_respawn) == ["Матка", "Холуй"]
+
+
+def test_respawn_equal_times_are_ordered_by_name():
+    boss_respawn = BossRespawn({"Фенрир": 100, "Йети": 100})
+    assert list(boss_respawn) == ["Йети", "Фенрир"]
+
+
+def test_revision_changes_only_on_update():
+    boss_respawn = BossRespawn()
+    boss_respawn["Йети"] = 100
+    revision = boss_respawn.revision
+    boss_respawn["Йети"] = 100
+    assert boss_respawn.revision == revision
+    boss_respawn["Йети"] = 200
+    assert boss_respawn.revision == revision + 1
+    del boss_respawn["Йети"]
+    assert boss_respawn.revision == revision + 2
+
+
+def test_diff_replaces_changed_lines_in_place():
+    output, written = BoardView._diff(["a", "b", "c"], ["a", "B", "c"])
+    assert output == "\033[2F\033[2KB\033[2E"
+    assert written == 1
+
+
+def test_diff_appends_new_lines():
+    output, written = BoardView._diff(["a", "b"], ["A", "b", "c"])
+    assert output == "\033[2F\033[2KA\033[2E" + "c\n"
+    assert written == 2
+
+
+def test_diff_clears_removed_lines_and_moves_cursor_up():
+    output, written = BoardView._diff(["a", "b", "c"], ["a"])
+    assert output == "\033[2F\033[2K\033[2E" + "\033[1F\033[2K\033[1E" + "\033[2F"
+    assert written == 0
+
+
+def test_render_skips_unchanged_board():
+    stream = StringIO()
+    view = BoardView(stream, live=True)
+    assert view.render(["a", "b"], 1) == 2
+    assert view.render(["a", "b"], 2) == 0
+    assert view.revision == 2
+    assert stream.getvalue() == "a\nb\n"
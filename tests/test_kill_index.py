@@ -0,0 +1,76 @@
+"""
+Тесты индекса убийств: повторная запись, последние убийства и оценка кулдаунов
+"""
+import pytest
+from kill_index import MIN_COOLDOWN, MIN_SAMPLES, KillIndex
+
+
+@pytest.fixture
+def kill_index(tmp_path):
+    """
+    Пустой индекс убийств во временной папке
+    :return: KillIndex
+    """
+    kill_index = KillIndex.open(str(tmp_path / "kills.sqlite3"))
+    yield kill_index
+    kill_index.close()
+
+
+def add_kills(kill_index, source, boss, intervals, start=0):
+    """
+    Функция, добавляющая убийства босса с заданными интервалами между ними
+    :param kill_index: Индекс убийств
+    :param source: Каталог логов
+    :param boss: Имя босса
+    :param intervals: Интервалы между убийствами в секундах
+    :param start: Время первого убийства (timestamp)
+    :return: None
+    """
+    kill_time = start
+    kill_index.add(source, kill_time, boss)
+    for interval in intervals:
+        kill_time += interval
+        kill_index.add(source, kill_time, boss)
+    kill_index.flush()
+
+
+def test_repeated_kills_are_stored_once(kill_index):
+    for _ in range(2):
+        kill_index.add("logs", 100.0, "Йети")
+        kill_index.add("logs", 200.0, "Йети")
+        kill_index.add("other", 100.0, "Йети")
+        assert kill_index.flush()
+    assert not kill_index.flush()
+    assert kill_index.connection.execute("SELECT COUNT(*) FROM kills").fetchone() == (3,)
+    assert kill_index.latest_kills("logs", 0) == {"Йети": 200.0}
+    assert kill_index.latest_kills("logs", 201) == {}
+
+
+def test_intervals_do_not_cross_sources(kill_index):
+    add_kills(kill_index, "a", "Йети", [600, 700])
+    add_kills(kill_index, "b", "Йети", [800], start=650)
+    assert sorted(kill_index.respawn_intervals("Йети")) == [600, 700, 800]
+
+
+def test_cooldown_needs_enough_samples(kill_index):
+    add_kills(kill_index, "logs", "Йети", [3000] * (MIN_SAMPLES - 1))
+    assert kill_index.learned_cooldowns({"Йети": 3600}) == {}
+    add_kills(kill_index, "logs", "Йети", [3000], start=3000 * (MIN_SAMPLES - 1))
+    assert kill_index.learned_cooldowns({"Йети": 3600}) == {"Йети": 3000}
+
+
+def test_cooldown_is_lower_decile_rounded_to_minute(kill_index):
+    add_kills(kill_index, "logs", "Йети", [1000 + 50 * number for number in range(20)])
+    assert kill_index.learned_cooldowns({"Йети": 2000}) == {"Йети": 1080}
+
+
+def test_cooldown_does_not_exceed_configured(kill_index):
+    add_kills(kill_index, "logs", "Йети", [5000] * MIN_SAMPLES)
+    assert kill_index.learned_cooldowns({"Йети": 3600}) == {"Йети": 3600}
+
+
+def test_short_intervals_are_floored(kill_index):
+    add_kills(kill_index, "logs", "Йети", [10] * MIN_SAMPLES)
+    add_kills(kill_index, "logs", "Холуй", [10] * MIN_SAMPLES)
+    assert kill_index.learned_cooldowns({"Йети": 3600, "Холуй": 90}) == \
+           {"Йети": 1800, "Холуй": MIN_COOLDOWN}
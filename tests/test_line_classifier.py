@@ -0,0 +1,70 @@
+"""
+Тесты разбора строк log-файла: перевод времени в timestamp около полуночи и выбор
+строк-кандидатов из блока байтов
+"""
+from datetime import datetime
+from line_classifier import CHAT_PREFIX, EVENT_MARKERS, TIME_LENGTH, BossKill, LineClassifier, \
+    candidate_lines
+from log_tailer import decode_lines
+
+DAY = datetime(2026, 1, 2).timestamp()
+
+
+def test_time_before_midnight_belongs_to_previous_day(clock):
+    clock.advance_to(DAY + 120)
+    classifier = LineClassifier()
+    assert classifier.timestamp("[23:59:50] line") == DAY - 10
+    assert classifier.timestamp("[00:01:00] line") == DAY + 60
+
+
+def test_time_within_tolerance_ahead_of_clock_stays_today(clock):
+    clock.advance_to(DAY + 120)
+    classifier = LineClassifier()
+    assert classifier.timestamp("[00:06:00] line") == DAY + 360
+    assert classifier.timestamp("[00:07:01] line") == DAY + 421 - 86400
+
+
+def test_day_is_refreshed_after_midnight(clock):
+    clock.advance_to(DAY - 5)
+    classifier = LineClassifier()
+    assert classifier.timestamp("[23:59:55] line") == DAY - 5
+    clock.advance_to(DAY + 5)
+    assert classifier.timestamp("[00:00:03] line") == DAY + 3
+    assert classifier.timestamp("[23:59:58] line") == DAY - 2
+
+
+def test_line_without_time_is_ignored(clock):
+    clock.advance_to(DAY)
+    assert LineClassifier().timestamp("Setting user: Alice") is None
+    assert LineClassifier().timestamp("[aa:bb:cc] line") is None
+
+
+def test_kill_after_midnight_is_dated_by_rollover(clock):
+    clock.advance_to(DAY + 30)
+    line = "[23:59:40] [Client thread/INFO]: [CHAT] Йети был повержен за 10 секунд"
+    assert LineClassifier().classify(line) == BossKill(DAY - 20, "Йети")
+
+
+def decoded_candidates(block):
+    """
+    Функция, выбирающая строки-кандидаты после декодирования всех строк блока
+    :param block: Блок байтов, состоящий из целых строк
+    :return: Список строк
+    """
+    markers = [marker.decode("utf-8") for marker in EVENT_MARKERS]
+    return [line for line in decode_lines(block)
+            if line.startswith(CHAT_PREFIX, TIME_LENGTH) and any(map(line.__contains__, markers))]
+
+
+def test_candidate_lines_match_full_decoding():
+    lines = ["[00:00:01] [Client thread/INFO]: [CHAT] Йети был повержен за 1 мин.\r\n",
+             "[00:00:02] [Client thread/INFO]: [CHAT] [Prison] Alice > ~шахта Золото\r\n",
+             "[00:00:03] [Client thread/INFO]: [CHAT] [Prison] Bob > привет\n",
+             "[00:00:04] [Render thread/WARN]: Фенрир был повержен за 1 мин.\n",
+             "[00:00:05] [Client thread/INFO]: [CHAT] [Prison] Alice > ~был\r\n",
+             "[00:00:06] [Client thread/INFO]: [CHAT] Холуй был повержен за 1 мин.\n"]
+    block = "".join(lines).encode("utf-8") + b"[00:00:07] [Client thread/INFO]: [CHAT] ~\xff\n"
+    assert candidate_lines(block) == decoded_candidates(block)
+    assert [line[:TIME_LENGTH] for line in candidate_lines(block)] == \
+           ["[00:00:01]", "[00:00:02]", "[00:00:05]", "[00:00:06]", "[00:00:07]"]
+    assert candidate_lines(block)[-1] == "[00:00:07] [Client thread/INFO]: [CHAT] ~\ufffd"
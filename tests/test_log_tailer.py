@@ -0,0 +1,108 @@
+"""
+Тесты чтения дописываемого log-файла: неполная строка, ротация, усечение и выбор
+строк-кандидатов на границе блоков чтения
+"""
+import os
+import pytest
+from line_classifier import candidate_lines
+from log_tailer import READ_SIZE, LogTailer, PollingWatcher
+from metrics import Metrics
+import log_tailer
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """
+    Путь к пустому latest.log во временной папке
+    :return: str
+    """
+    file_path = str(tmp_path / "latest.log")
+    open(file_path, "wb").close()
+    return file_path
+
+
+@pytest.fixture
+def tailer(log_file):
+    """
+    LogTailer на пустом latest.log с периодической проверкой файла
+    :return: LogTailer
+    """
+    tailer = LogTailer(log_file, PollingWatcher(log_file))
+    yield tailer
+    tailer.close()
+
+
+def append(file_path, data):
+    """
+    Функция, дописывающая байты в конец файла, как это делает клиент игры
+    :param file_path: Путь к файлу
+    :param data: Байты
+    :return: None
+    """
+    with open(file_path, "ab") as file:
+        file.write(data)
+
+
+def test_partial_line_is_buffered(log_file, tailer):
+    append(log_file, b"[00:00:01] first\n[00:00:02] sec")
+    assert list(tailer) == ["[00:00:01] first"]
+    assert tailer.position == len(b"[00:00:01] first\n")
+    append(log_file, b"ond\r\n")
+    assert list(tailer) == ["[00:00:02] second"]
+    assert tailer.position == os.path.getsize(log_file)
+    assert list(tailer) == []
+
+
+def test_rotation_reopens_new_file(log_file, tailer):
+    append(log_file, b"old 1\n")
+    assert list(tailer) == ["old 1"]
+    append(log_file, b"old 2\n")
+    os.replace(log_file, log_file + ".1")
+    append(log_file, b"new 1\n")
+    assert list(tailer) == ["old 2", "new 1"]
+    assert tailer.inode == os.stat(log_file).st_ino
+    assert tailer.position == len(b"new 1\n")
+
+
+def test_truncation_rereads_from_start(log_file, tailer):
+    append(log_file, b"line 1\nline 2\n")
+    assert list(tailer) == ["line 1", "line 2"]
+    with open(log_file, "wb") as file:
+        file.write(b"new\n")
+    assert list(tailer) == ["new"]
+    assert tailer.position == len(b"new\n")
+
+
+def test_line_filter_receives_whole_lines(log_file):
+    blocks = []
+    tailer = LogTailer(log_file, PollingWatcher(log_file),
+                       lambda block: blocks.append(block) or [])
+    try:
+        append(log_file, b"a\nb")
+        list(tailer)
+        append(log_file, b"c\n")
+        list(tailer)
+    finally:
+        tailer.close()
+    assert blocks == [b"a\n", b"bc\n"]
+
+
+def test_candidate_line_split_across_read_blocks(log_file, monkeypatch):
+    metrics = Metrics()
+    metrics.enable()
+    monkeypatch.setattr(log_tailer, "METRICS", metrics)
+    kill = "[00:00:01] [Client thread/INFO]: [CHAT] Йети был повержен за 1 мин.\r\n" \
+        .encode("utf-8")
+    filler = b"[00:00:00] [Client thread/INFO]: [CHAT] [Prison] Steve > "
+    lines = (READ_SIZE - len(kill)) // (len(filler) + 2)
+    padding = READ_SIZE - kill.index("был".encode("utf-8")) - 3 - lines * (len(filler) + 2)
+    append(log_file, (filler + b"\r\n") * (lines - 1) + filler + b"a" * padding + b"\r\n" +
+           kill + filler + b"~\r\n")
+    tailer = LogTailer(log_file, PollingWatcher(log_file), candidate_lines)
+    try:
+        assert list(tailer) == [kill.rstrip().decode("utf-8"),
+                                "[00:00:00] [Client thread/INFO]: [CHAT] [Prison] Steve > ~"]
+    finally:
+        tailer.close()
+    assert metrics.snapshot()["counters"] == \
+           [{"name": "lines_scanned", "kind": None, "value": lines + 2}]
@@ -0,0 +1,49 @@
+"""
+Тесты очереди оповещений: объединение одинаковых оповещений и ограничение частоты показа
+"""
+from time import monotonic
+from notifier import NotificationDispatcher
+
+
+def test_equal_notifications_are_coalesced_within_window(clock):
+    shown = []
+    dispatcher = NotificationDispatcher(shown.append, 0, coalesce_window=10)
+    dispatcher.start()
+    assert dispatcher.submit("Босс", "Йети")
+    assert not dispatcher.submit("Босс", "Йети")
+    assert dispatcher.submit("Босс", "Холуй")
+    clock.advance_to(9)
+    assert not dispatcher.submit("Босс", "Йети")
+    clock.advance_to(10)
+    assert dispatcher.submit("Босс", "Йети")
+    dispatcher.stop()
+    assert [(notification.message, notification.created) for notification in shown] == \
+           [("Йети", 0), ("Холуй", 0), ("Йети", 10)]
+
+
+def test_notifications_are_shown_no_more_often_than_interval(clock):
+    shown_at = []
+    dispatcher = NotificationDispatcher(lambda _: shown_at.append(monotonic()), 0.05, 0)
+    for number in range(4):
+        dispatcher.submit("Шахта", f"Шахта {number}")
+    dispatcher.start()
+    dispatcher.stop()
+    assert len(shown_at) == 4
+    assert all(later - earlier >= 0.049 for earlier, later in zip(shown_at, shown_at[1:]))
+
+
+def test_backend_error_does_not_stop_dispatcher(clock, capsys):
+    shown = []
+
+    def backend(notification):
+        if notification.message == "ошибка":
+            raise OSError("нет доступа")
+        shown.append(notification.message)
+
+    dispatcher = NotificationDispatcher(backend, 0, 0)
+    dispatcher.start()
+    dispatcher.submit("Ooops...", "ошибка")
+    dispatcher.submit("Успешно!", "показано")
+    dispatcher.stop()
+    assert shown == ["показано"]
+    assert "нет доступа" in capsys.readouterr().out
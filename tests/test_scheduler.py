@@ -0,0 +1,70 @@
+"""
+Тесты планировщика событий: замена и отмена по ключу, выполнение наступивших событий
+"""
+from scheduler import Scheduler
+
+
+def test_events_run_in_deadline_order():
+    scheduler = Scheduler()
+    executed = []
+    for key, deadline in (("c", 30), ("a", 10), ("b", 20), ("d", 40)):
+        scheduler.schedule(key, deadline, lambda deadline, key=key: executed.append(key))
+    assert scheduler.next_deadline() == 10
+    assert scheduler.run_due(30) == 3
+    assert executed == ["a", "b", "c"]
+    assert scheduler.pending() == [(40, "d")]
+
+
+def test_equal_deadlines_run_in_scheduling_order():
+    scheduler = Scheduler()
+    executed = []
+    for key in ("b", "a", "c"):
+        scheduler.schedule(key, 10, lambda deadline, key=key: executed.append(key))
+    scheduler.run_due(10)
+    assert executed == ["b", "a", "c"]
+
+
+def test_rescheduling_replaces_event():
+    scheduler = Scheduler()
+    executed = []
+    scheduler.schedule("boss", 10, lambda deadline: executed.append(("old", deadline)))
+    scheduler.schedule("boss", 20, lambda deadline: executed.append(("new", deadline)))
+    assert scheduler.pending() == [(20, "boss")]
+    assert scheduler.next_deadline() == 20
+    assert scheduler.run_due(15) == 0
+    assert scheduler.run_due(20) == 1
+    assert executed == [("new", 20)]
+
+
+def test_cancel_removes_event():
+    scheduler = Scheduler()
+    scheduler.schedule("mine", 10, lambda deadline: None)
+    assert "mine" in scheduler
+    assert scheduler.cancel("mine")
+    assert not scheduler.cancel("mine")
+    assert "mine" not in scheduler
+    assert scheduler.next_deadline() is None
+    assert scheduler.run_due(100) == 0
+
+
+def test_events_scheduled_while_running_are_run_if_due():
+    scheduler = Scheduler()
+    executed = []
+
+    def remind(deadline):
+        executed.append(deadline)
+        scheduler.schedule("mine", deadline + 5, remind)
+
+    scheduler.schedule("mine", 10, remind)
+    assert scheduler.run_due(22) == 3
+    assert executed == [10, 15, 20]
+    assert scheduler.pending() == [(25, "mine")]
+
+
+def test_event_can_cancel_another_due_event():
+    scheduler = Scheduler()
+    executed = []
+    scheduler.schedule("first", 10, lambda deadline: scheduler.cancel("second"))
+    scheduler.schedule("second", 10, lambda deadline: executed.append("second"))
+    assert scheduler.run_due(10) == 1
+    assert executed == []
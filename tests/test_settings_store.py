@@ -0,0 +1,112 @@
+"""
+Тесты хранилища настроек: запись, кэш разобранных настроек и перечитывание внешних изменений
+"""
+import os
+import pytest
+from settings_store import CACHE_SUFFIX, SETTINGS_ENCODING, SettingsStore
+
+SETTINGS = """bosses_cooldown:
+    Йети: 180
+notification_duration: 3
+mines_cooldown:
+    Карьер: 600
+colored: true
+"""
+
+
+@pytest.fixture
+def settings_path(tmp_path):
+    """
+    Путь к settings.yaml во временной папке
+    :return: str
+    """
+    file_path = str(tmp_path / "settings.yaml")
+    write(file_path, SETTINGS, 1)
+    return file_path
+
+
+def write(file_path, text, version):
+    """
+    Функция, записывающая файл настроек извне с заданным временем изменения, чтобы изменение
+    обнаруживалось независимо от точности времени файловой системы
+    :param file_path: Путь к файлу
+    :param text: Содержимое файла
+    :param version: Номер версии файла, определяющий время изменения
+    :return: None
+    """
+    with open(file_path, "w", encoding=SETTINGS_ENCODING) as file:
+        file.write(text)
+    os.utime(file_path, ns=(version * 10 ** 9, version * 10 ** 9))
+
+
+def test_flush_writes_changes_atomically(settings_path):
+    settings = SettingsStore.open(settings_path)
+    assert not settings.flush()
+    settings.add_boss("Холуй", 45)
+    settings.set_notification_duration(5)
+    assert settings.flush()
+    assert not settings.dirty
+    assert not os.path.exists(settings_path + ".tmp")
+    reopened = SettingsStore.open(settings_path)
+    assert reopened.bosses_cooldown == {"Йети": 180 * 60, "Холуй": 45 * 60}
+    assert reopened.notification_duration == 5
+    assert not settings.reload_if_changed()
+
+
+def test_cache_is_used_until_file_changes(settings_path):
+    SettingsStore.open(settings_path)
+    assert os.path.exists(settings_path + CACHE_SUFFIX)
+    with open(settings_path + CACHE_SUFFIX, encoding="utf-8") as file:
+        cache = file.read()
+    with open(settings_path + CACHE_SUFFIX, "w", encoding="utf-8") as file:
+        file.write(cache.replace("180", "181"))
+    assert SettingsStore.open(settings_path).bosses_cooldown == {"Йети": 181 * 60}
+    write(settings_path, SETTINGS.replace("180", "182"), 2)
+    assert SettingsStore.open(settings_path).bosses_cooldown == {"Йети": 182 * 60}
+
+
+def test_reload_picks_up_external_changes(settings_path):
+    settings = SettingsStore.open(settings_path)
+    assert not settings.reload_if_changed()
+    write(settings_path, SETTINGS.replace("notification_duration: 3", "notification_duration: 7"),
+          2)
+    assert settings.reload_if_changed()
+    assert settings.notification_duration == 7
+
+
+def test_unsaved_changes_take_priority_over_external_ones(settings_path):
+    settings = SettingsStore.open(settings_path)
+    settings.set_notification_duration(5)
+    write(settings_path, SETTINGS.replace("notification_duration: 3", "notification_duration: 7"),
+          2)
+    assert not settings.reload_if_changed()
+    assert settings.notification_duration == 5
+
+
+@pytest.mark.parametrize("text", [SETTINGS + "bosses_cooldown: [\n",
+                                  SETTINGS.replace("colored: true", "colored: true\napi: maybe"),
+                                  SETTINGS.replace("    Йети: 180", "    Йети: долго"),
+                                  SETTINGS.replace("notification_duration: 3\n", ""),
+                                  "- список\n"])
+def test_invalid_file_is_rejected_once(settings_path, text):
+    settings = SettingsStore.open(settings_path)
+    write(settings_path, text, 2)
+    with pytest.raises(ValueError):
+        settings.reload_if_changed()
+    assert not settings.reload_if_changed()
+    assert settings.notification_duration == 3
+    write(settings_path, SETTINGS.replace("Йети: 180", "Йети: 200"), 3)
+    assert settings.reload_if_changed()
+    assert settings.bosses_cooldown == {"Йети": 200 * 60}
+
+
+def test_missing_file_keeps_settings(settings_path):
+    settings = SettingsStore.open(settings_path)
+    os.remove(settings_path)
+    with pytest.raises(FileNotFoundError):
+        settings.reload_if_changed()
+    assert not settings.reload_if_changed()
+    write(settings_path, SETTINGS.replace("Йети: 180", "Йети: 200"), 2)
+    assert settings.reload_if_changed()
+    assert settings.bosses_cooldown == {"Йети": 200 * 60}
+
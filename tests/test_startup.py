@@ -0,0 +1,30 @@
+"""
+Тест бюджета холодного запуска: запуск интерпретатора, импорт приложения, загрузка настроек
+и разбор latest.log до первого события в отдельном процессе, как в бенчмарке startup
+"""
+from os import path
+from time import perf_counter
+import shutil
+import subprocess
+import sys
+
+BENCHMARKS_PATH = path.join(path.dirname(path.dirname(path.abspath(__file__))), "benchmarks")
+ATTEMPTS = 3
+
+
+def test_cold_start_fits_budget(tmp_path):
+    sys.path.insert(0, BENCHMARKS_PATH)
+    from generate_logs import write_logs
+    from run_benchmarks import MIN_THROUGHPUT, SETTINGS_PATH, SRC_PATH, STARTUP_SCRIPT
+    log_path = str(tmp_path / "logs")
+    write_logs(log_path, lines=1000)
+    command = [sys.executable, "-c", STARTUP_SCRIPT, SRC_PATH,
+               shutil.copy(SETTINGS_PATH, str(tmp_path / "settings.yaml")),
+               path.join(log_path, "latest.log")]
+    subprocess.run(command, check=True)
+    durations = []
+    for _ in range(ATTEMPTS):
+        started = perf_counter()
+        subprocess.run(command, check=True)
+        durations.append(perf_counter() - started)
+    assert min(durations) <= 1 / MIN_THROUGHPUT["startup"]